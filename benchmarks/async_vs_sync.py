@@ -0,0 +1,64 @@
+"""
+Requests/sec of the async ORM handlers against the previous sync handlers at high concurrency.
+
+The sync versions are mounted under /sync for the duration of the run only. They run on AnyIO's
+threadpool (40 threads by default), exactly like the handlers did before the async path.
+
+    python -m benchmarks.async_vs_sync --concurrency 500 --requests 10000
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.common import print_results, run_load, seed_user, setup_django
+
+
+def mount_sync_routes(app) -> None:
+    from fastapi import HTTPException, Query
+
+    from db_app.models import Account as AccountModel
+    from routers.accounts import Account
+
+    @app.get('/sync/accounts/', response_model=list[Account])
+    def read_accounts_sync(user_id: int = Query(...)):
+        return AccountModel.objects.filter(user_id=user_id)
+
+    @app.get('/sync/accounts/{account_id}', response_model=Account)
+    def read_account_sync(account_id: int, user_id: int = Query(...)):
+        account = AccountModel.objects.filter(id=account_id, user_id=user_id)
+        if not account.first():
+            raise HTTPException(status_code=404, detail='Account does not found.')
+        return account.first()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--accounts', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from db_app.models import Account
+    from main import app
+
+    mount_sync_routes(app)
+    user_id = seed_user(accounts=args.accounts)
+    account_id = Account.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+
+    scenarios = {
+        'sync  GET /accounts/': '/sync/accounts/',
+        'async GET /accounts/': '/accounts/',
+        'sync  GET /accounts/{id}': f'/sync/accounts/{account_id}',
+        'async GET /accounts/{id}': f'/accounts/{account_id}',
+    }
+    results = {}
+    for name, url in scenarios.items():
+        results[name] = asyncio.run(
+            run_load(app, 'GET', url, concurrency=args.concurrency, requests=args.requests, params={'user_id': user_id})
+        )
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Rows/sec of POST /transactions/bulk for JSON array and NDJSON bodies.
+
+    python -m benchmarks.bulk_import --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000, help='Rows per request.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--accounts', type=int, default=5)
+    args = parser.parse_args()
+
+    from benchmarks.common import seed_user, setup_django
+
+    setup_django()
+    from fastapi.testclient import TestClient
+
+    from db_app.models import Account
+    from enums import TransactionTypeEnum
+    from main import app
+
+    user_id = seed_user(accounts=args.accounts)
+    account_ids = list(Account.objects.filter(user_id=user_id).values_list('id', flat=True))
+    rows = [
+        {
+            'amount': f'{i % 1000}.25',
+            'description': f'Imported {i}',
+            'date': '2025-01-01T00:00:00',
+            'account_id': account_ids[i % len(account_ids)],
+            'transaction_type': TransactionTypeEnum.EXPENSE.value,
+        }
+        for i in range(args.rows)
+    ]
+    bodies = {
+        'application/json': json.dumps(rows),
+        'application/x-ndjson': '\n'.join(json.dumps(row) for row in rows),
+    }
+
+    with TestClient(app) as client:
+        for content_type, body in bodies.items():
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = client.post(
+                    '/transactions/bulk',
+                    params={'user_id': user_id},
+                    content=body,
+                    headers={'content-type': content_type},
+                )
+                timings.append(time.perf_counter() - started)
+                assert response.status_code == 201 and response.json()['created'] == args.rows, response.text
+            best = min(timings)
+            print(f'{content_type:<24}{args.rows:>8} rows  best {best * 1000:8.1f} ms  {args.rows / best:10.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Shared helpers for the benchmark scripts. Run them from the project root, e.g. `python -m benchmarks.async_vs_sync`.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+
+def configure_environment() -> None:
+    """
+    Settings a benchmark run needs. Unless DB_ENGINE / DB_NAME are set in the environment, a throwaway SQLite
+    file in the temp dir is used so benchmarks never touch the development database.
+    """
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+    os.environ.setdefault('ALGORITHM', 'HS256')
+    os.environ.setdefault('ACCESS_TOKEN_EXPIRE_MINUTES', '30')
+    if 'DB_ENGINE' not in os.environ and 'DB_NAME' not in os.environ:
+        os.environ['DB_NAME'] = str(Path(tempfile.gettempdir()) / 'fast_api_django_orm_bench.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+
+def setup_django() -> None:
+    """Configure (see `configure_environment`) and migrate a database for a benchmark run."""
+    configure_environment()
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def seed_user(accounts: int = 20, transactions: int = 0) -> int:
+    """Create one user owning `accounts` accounts and `transactions` transactions; returns the user id."""
+    from datetime import date, timedelta
+    from decimal import Decimal
+
+    from db_app.models import Account, Transaction, User
+    from enums import TransactionTypeEnum
+
+    user = User.objects.create(name='Bench User', email=f'bench-{time.time_ns()}@example.com', password=b'x')
+    created_accounts = Account.objects.bulk_create(
+        Account(user=user, name=f'Account {i}', balance=Decimal('100.00')) for i in range(accounts)
+    )
+    today = date.today()
+    Transaction.objects.bulk_create(
+        (
+            Transaction(
+                user=user,
+                account=created_accounts[i % accounts],
+                date=today - timedelta(days=i % 365),
+                amount=Decimal('12.34'),
+                description=f'Transaction {i}',
+                transaction_type=TransactionTypeEnum.EXPENSE.value,
+            )
+            for i in range(transactions)
+        ),
+        batch_size=5000,
+    )
+    return user.id
+
+
+async def run_load(app, method: str, url: str, *, concurrency: int, requests: int, **request_kwargs) -> dict:
+    """
+    Fire `requests` requests at an ASGI app in-process, keeping `concurrency` of them in flight at all times.
+    Returns throughput and latency percentiles in milliseconds.
+    """
+    return await run_mixed_load(app, [(1, method, url, request_kwargs)], concurrency=concurrency, requests=requests)
+
+
+async def run_mixed_load(
+    app, mix: list[tuple[int, str, str, dict]], *, concurrency: int, requests: int, seed: int = 0
+) -> dict:
+    """
+    Like `run_load`, but each request is drawn from `mix`, a list of (weight, method, url, request kwargs).
+    The draw is seeded, so runs being compared send the same sequence of requests.
+    """
+    import httpx
+
+    rng = random.Random(seed)
+    weights = [weight for weight, *_ in mix]
+    plan = rng.choices(range(len(mix)), weights=weights, k=requests)
+    latencies: list[float] = []
+    errors = 0
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', limits=limits) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while plan:
+                _, method, url, request_kwargs = mix[plan.pop()]
+                started = time.perf_counter()
+                response = await client.request(method, url, **request_kwargs)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentiles[49], 2),
+        'p95_ms': round(percentiles[94], 2),
+        'p99_ms': round(percentiles[98], 2),
+    }
+
+
+def print_results(results: dict[str, dict]) -> None:
+    columns = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms')
+    print(f'{"name":<40}' + ''.join(f'{column:>12}' for column in columns))
+    for name, result in results.items():
+        print(f'{name:<40}' + ''.join(f'{result[column]:>12}' for column in columns))
+
+
+def environment() -> dict:
+    """What a result was measured on, so runs from different commits or machines are not compared blindly."""
+    from django.db import connection
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(UTC).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'database': connection.vendor,
+    }
+
+
+def save_results(path: str, suite: str, results: dict[str, dict], **params) -> None:
+    """Write a run as JSON, to be compared against another one with `python -m benchmarks.compare`."""
+    report = {'suite': suite, 'environment': environment(), 'params': params, 'results': results}
+    Path(path).write_text(json.dumps(report, indent=2) + '\n')
+    print(f'Saved {len(results)} results to {path}')
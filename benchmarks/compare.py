@@ -0,0 +1,76 @@
+"""
+Compare two saved benchmark runs (`--output` of `benchmarks.micro` or `benchmarks.load`) and fail on regressions.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+
+Latency (`*_ms`, `*_us`) regresses when it goes up, throughput (`rps`, `ops_per_sec`) when it goes down.
+Exits with status 1 when any metric got worse by more than the threshold, so it can gate CI.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+LOWER_IS_BETTER = ('_ms', '_us')
+HIGHER_IS_BETTER = ('rps', 'ops_per_sec')
+
+
+def change(metric: str, before: float, after: float) -> float | None:
+    """How much worse `after` is than `before`, in percent (negative when better). None if not a timing."""
+    if not before:
+        return None
+    if metric.endswith(LOWER_IS_BETTER):
+        return (after - before) / before * 100
+    if metric in HIGHER_IS_BETTER:
+        return (before - after) / before * 100
+    return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print a row per benchmark and metric; returns the regressions over `threshold` percent."""
+    regressions = []
+    print(f'{"name":<48}{"metric":>12}{"baseline":>12}{"current":>12}{"change":>10}')
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            print(f'{name:<48}{"missing from current run":>46}')
+            continue
+        for metric, value in before.items():
+            worse = change(metric, value, after.get(metric, 0))
+            if worse is None:
+                continue
+            flag = '  !' if worse > threshold else ''
+            print(f'{name:<48}{metric:>12}{value:>12}{after[metric]:>12}{worse:>+9.1f}%{flag}')
+            if worse > threshold:
+                regressions.append(f'{name} {metric}: {value} -> {after[metric]} ({worse:+.1f}%)')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Percent a metric may get worse.')
+    args = parser.parse_args()
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    if baseline['suite'] != current['suite']:
+        sys.exit(f'Cannot compare a {baseline["suite"]} run with a {current["suite"]} run')
+    for key in ('commit', 'cpus', 'database'):
+        if baseline['environment'].get(key) != current['environment'].get(key):
+            print(f'Note: {key} differs ({baseline["environment"].get(key)} -> {current["environment"].get(key)})')
+    if baseline['params'] != current['params']:
+        print(f'Note: parameters differ ({baseline["params"]} -> {current["params"]})')
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold}%:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
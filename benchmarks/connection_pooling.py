@@ -0,0 +1,75 @@
+"""
+Latency of GET /accounts/{id} when every request opens a new connection, with persistent connections,
+and with Django's psycopg pool. Each configuration runs in its own process, since settings are read at startup.
+
+The difference is the connection handshake, so point it at PostgreSQL (or pgbouncer), e.g.
+
+    DB_ENGINE=django.db.backends.postgresql DB_NAME=app DB_HOST=127.0.0.1 DB_USER=postgres \\
+        python -m benchmarks.connection_pooling --concurrency 50 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import print_results, run_load, seed_user, setup_django
+
+CONFIGURATIONS = {
+    'reconnect per request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'false'},
+    'persistent connections': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'false'},
+    'psycopg pool': {'DB_POOL': 'true'},
+}
+
+
+def run_one(args) -> None:
+    setup_django()
+    from main import app
+
+    result = asyncio.run(
+        run_load(
+            app,
+            'GET',
+            f'/accounts/{args.account_id}',
+            concurrency=args.concurrency,
+            requests=args.requests,
+            params={'user_id': args.user_id},
+        )
+    )
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--user-id', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--account-id', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.user_id:
+        run_one(args)
+        return
+
+    setup_django()
+    from db_app.models import Account
+
+    user_id = seed_user(accounts=1)
+    account_id = Account.objects.filter(user_id=user_id).values_list('id', flat=True).get()
+    results = {}
+    for name, overrides in CONFIGURATIONS.items():
+        if overrides.get('DB_POOL') == 'true' and 'sqlite3' in os.environ.get('DB_ENGINE', 'sqlite3'):
+            continue  # The pool is a PostgreSQL feature
+        command = [sys.executable, '-m', 'benchmarks.connection_pooling', '--user-id', str(user_id)]
+        command += ['--account-id', str(account_id), '--concurrency', str(args.concurrency)]
+        command += ['--requests', str(args.requests)]
+        output = subprocess.run(
+            command, env={**os.environ, **overrides}, check=True, capture_output=True, text=True
+        ).stdout
+        results[name] = json.loads(output.splitlines()[-1])
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
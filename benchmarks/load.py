@@ -0,0 +1,82 @@
+"""
+In-process load test of the main read and write endpoints: each endpoint gets its own run at a fixed concurrency,
+reported as requests/sec and p50/p95/p99 latency. Requests go through the full ASGI app (middleware, routing,
+auth, serialization) without a socket, so the numbers are the app's own cost.
+
+    python -m benchmarks.load --concurrency 50 --requests 2000 --output load.json
+    python -m benchmarks.load --filter summary
+
+For a database at scale, seed it first (`python manage.py seed_data --scale 6`) and point DB_NAME at it.
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from benchmarks.common import print_results, run_load, save_results, seed_user, setup_django
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint.')
+    parser.add_argument('--transactions', type=int, default=10_000, help='Transactions of the benchmark user.')
+    parser.add_argument('--filter', default='', help='Only run endpoints whose name contains this.')
+    parser.add_argument('--output', help='Save the results as JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    from db_app.models import Account, Transaction, User
+    from main import app
+    from utils import create_access_token
+
+    user_id = seed_user(accounts=20, transactions=args.transactions)
+    account_id = Account.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+    transaction_id = Transaction.objects.filter(user_id=user_id).values_list('id', flat=True).first()
+    email = User.objects.values_list('email', flat=True).get(id=user_id)
+    token = create_access_token({'email': email, 'id': user_id}, expires_delta=timedelta(hours=1))
+    params = {'params': {'user_id': user_id}}
+    new_transaction = {
+        'transaction_type': 'Expense',
+        'amount': '12.34',
+        'description': 'Coffee',
+        'date': '2025-01-01T00:00:00',
+        'account_id': account_id,
+    }
+
+    scenarios = {
+        'GET /users/me': ('GET', '/users/me', {'headers': {'Authorization': f'Bearer {token}'}}),
+        'GET /accounts/': ('GET', '/accounts/', params),
+        'GET /accounts/{id}': ('GET', f'/accounts/{account_id}', params),
+        'GET /transactions/': ('GET', '/transactions/', params),
+        'GET /transactions/{id}': ('GET', f'/transactions/{transaction_id}', params),
+        'GET /transactions/search': (
+            'GET',
+            '/transactions/search',
+            {'params': {'user_id': user_id, 'q': 'transaction 1'}},
+        ),
+        'GET /transactions/summary/by-type': ('GET', '/transactions/summary/by-type', params),
+        'POST /transactions/': ('POST', '/transactions/', {**params, 'json': new_transaction}),
+    }
+    results = {}
+    for name, (method, url, request_kwargs) in scenarios.items():
+        if args.filter not in name:
+            continue
+        results[name] = asyncio.run(
+            run_load(app, method, url, concurrency=args.concurrency, requests=args.requests, **request_kwargs)
+        )
+    print_results(results)
+
+    if args.output:
+        save_results(
+            args.output,
+            'load',
+            results,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            transactions=args.transactions,
+        )
+
+
+if __name__ == '__main__':
+    main()
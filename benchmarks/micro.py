@@ -0,0 +1,110 @@
+"""
+Micro-benchmarks of the hot building blocks: token decoding, the Pydantic models and serializers, and the
+`*_db` helpers the routers call. Each one runs in a loop sized by `timeit`, so the numbers are per call.
+
+    python -m benchmarks.micro --transactions 10000 --output micro.json
+    python -m benchmarks.micro --filter jwt
+"""
+
+import argparse
+import asyncio
+import statistics
+import timeit
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    """Per-call timings of `func`, from `repeat` rounds of as many calls as fit in about 0.2 s."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'calls': number * repeat,
+        'ops_per_sec': round(1 / statistics.median(per_call), 1),
+        'median_us': round(statistics.median(per_call) * 1_000_000, 2),
+        'best_us': round(min(per_call) * 1_000_000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=10_000, help='Transactions of the benchmark user.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this.')
+    parser.add_argument('--output', help='Save the results as JSON.')
+    args = parser.parse_args()
+
+    from benchmarks.common import save_results, seed_user, setup_django
+
+    setup_django()
+    from db_app.models import Account, Transaction, User
+    from routers import accounts, transactions
+    from utils import create_access_token, decode_access_token, token_cache
+
+    user_id = seed_user(accounts=20, transactions=args.transactions)
+    account = Account.objects.filter(user_id=user_id).first()
+    transaction = Transaction.objects.filter(user_id=user_id).first()
+    email = User.objects.values_list('email', flat=True).get(id=user_id)
+    token = create_access_token({'email': email, 'id': user_id}, expires_delta=timedelta(hours=1))
+    page_rows = list(
+        Transaction.objects.filter(user_id=user_id)
+        .order_by('-date', '-id')
+        .values(*transactions.TRANSACTION_FIELDS)[: transactions.DEFAULT_PAGE_SIZE]
+    )
+    create_payload = {
+        'transaction_type': 'Expense',
+        'amount': '12.34',
+        'description': 'Coffee',
+        'date': '2025-01-01T00:00:00',
+        'account_id': account.id,
+    }
+
+    # One loop for every async call, so a sample is the helper itself and not event loop startup
+    loop = asyncio.new_event_loop()
+
+    def run(coroutine_function: Callable[[], Awaitable[object]]) -> Callable[[], object]:
+        return lambda: loop.run_until_complete(coroutine_function())
+
+    def decode_uncached():
+        token_cache.delete(token)
+        return run(lambda: decode_access_token(token))()
+
+    benchmarks = {
+        'jwt: decode_access_token (verify)': decode_uncached,
+        'jwt: decode_access_token (cached)': run(lambda: decode_access_token(token)),
+        'pydantic: TransactionCreate validate': lambda: transactions.TransactionCreate.model_validate(create_payload),
+        'pydantic: Account from ORM + dump_json': lambda: accounts.account_adapter.dump_json(
+            accounts.account_adapter.validate_python(account)
+        ),
+        'pydantic: Transaction from ORM + dump_json': lambda: transactions.transaction_adapter.dump_json(
+            transactions.transaction_adapter.validate_python(transaction)
+        ),
+        'pydantic: transaction page dump_json': lambda: transactions.transaction_page_adapter.dump_json(
+            {'items': page_rows, 'next_cursor': None}
+        ),
+        'db: get_account_db': run(lambda: accounts.get_account_db(account.id, user_id)),
+        'db: get_all_accounts_db': run(lambda: accounts.get_all_accounts_db(user_id)),
+        'db: get_transaction_db': run(lambda: transactions.get_transaction_db(transaction.id, user_id)),
+        'db: get_transactions_page_db': run(lambda: transactions.get_transactions_page_db(user_id)),
+        'db: get_summary_by_type_db': run(lambda: transactions.get_summary_by_type_db(user_id, None, None)),
+        'db: search_transactions_db': run(
+            lambda: transactions.search_transactions_db(user_id, 'transaction 1', transactions.DEFAULT_PAGE_SIZE)
+        ),
+    }
+
+    results = {}
+    for name, func in benchmarks.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(func, args.repeat)
+        result = results[name]
+        print(f'{name:<48}{result["median_us"]:>12.2f} us{result["ops_per_sec"]:>14.1f} ops/s')
+    loop.close()
+
+    if args.output:
+        save_results(args.output, 'micro', results, transactions=args.transactions, repeat=args.repeat)
+
+
+if __name__ == '__main__':
+    main()
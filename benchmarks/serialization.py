@@ -0,0 +1,70 @@
+"""
+Per-row cost of encoding list responses: the `response_model` path (model instances, validated into Pydantic
+models, dumped to Python and `json.dumps`-ed, as FastAPI does) against `.values()` rows encoded by a precompiled
+TypedDict `TypeAdapter` straight to JSON bytes.
+
+    python -m benchmarks.serialization --rows 500 --repeat 20
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+
+
+def best_of(repeat: int, func: Callable[[], bytes]) -> tuple[float, bytes]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500, help='Rows per response (MAX_PAGE_SIZE by default).')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks.common import seed_user, setup_django
+
+    setup_django()
+    from pydantic import TypeAdapter
+
+    from db_app.models import Transaction
+    from routers.transactions import TRANSACTION_FIELDS, TransactionPage, transaction_page_adapter
+
+    user_id = seed_user(accounts=5, transactions=args.rows)
+    queryset = Transaction.objects.filter(user_id=user_id).order_by('-date', '-id')[: args.rows]
+    response_model = TypeAdapter(TransactionPage)
+
+    def encode_models(instances: list) -> bytes:
+        # What FastAPI does with a `response_model`: validate, dump to JSON-able Python, then json.dumps
+        content = response_model.dump_python(
+            response_model.validate_python({'items': instances, 'next_cursor': None}), mode='json'
+        )
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+    def encode_rows(rows: list) -> bytes:
+        return transaction_page_adapter.dump_json({'items': rows, 'next_cursor': None})
+
+    instances = list(queryset.all())
+    rows = list(queryset.values(*TRANSACTION_FIELDS))
+    results = {
+        'response_model: encode': best_of(args.repeat, lambda: encode_models(instances)),
+        'response_model: fetch + encode': best_of(args.repeat, lambda: encode_models(list(queryset.all()))),
+        'values + TypeAdapter: encode': best_of(args.repeat, lambda: encode_rows(rows)),
+        'values + TypeAdapter: fetch + encode': best_of(
+            args.repeat, lambda: encode_rows(list(queryset.values(*TRANSACTION_FIELDS)))
+        ),
+    }
+
+    bodies = {json.dumps(json.loads(body), sort_keys=True) for _, body in results.values()}
+    assert len(bodies) == 1, 'Both paths must produce the same JSON'
+    for name, (best, _) in results.items():
+        print(f'{name:<40}{best * 1000:8.2f} ms  {best / args.rows * 1_000_000:8.2f} us/row')
+
+
+if __name__ == '__main__':
+    main()
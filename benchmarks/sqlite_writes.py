@@ -0,0 +1,92 @@
+"""
+Mixed read/write throughput on SQLite: the default rollback journal, WAL with the tuned pragmas,
+and WAL plus the single-writer queue that group-commits concurrent writes.
+
+Each configuration runs in its own process against its own fresh database file
+(the journal mode sticks to a file once set).
+
+    python -m benchmarks.sqlite_writes --concurrency 100 --requests 5000 --write-ratio 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import print_results, run_mixed_load, seed_user, setup_django
+
+CONFIGURATIONS = {
+    'rollback journal': {'SQLITE_PERFORMANCE_MODE': 'false', 'SQLITE_WRITE_QUEUE': 'false'},
+    'WAL + pragmas': {'SQLITE_PERFORMANCE_MODE': 'true', 'SQLITE_WRITE_QUEUE': 'false'},
+    'WAL + pragmas + write queue': {'SQLITE_PERFORMANCE_MODE': 'true', 'SQLITE_WRITE_QUEUE': 'true'},
+}
+
+
+def run_one(args) -> None:
+    setup_django()
+    from db_app.models import Account
+    from enums import TransactionTypeEnum
+    from main import app
+
+    user_id = seed_user(accounts=5, transactions=10_000)
+    account_ids = list(Account.objects.filter(user_id=user_id).values_list('id', flat=True))
+    params = {'user_id': user_id}
+    writes = [
+        (
+            1,
+            'POST',
+            '/transactions/',
+            {
+                'params': params,
+                'json': {
+                    'amount': '9.99',
+                    'description': 'Benchmark',
+                    'account_id': account_id,
+                    'transaction_type': TransactionTypeEnum.EXPENSE.value,
+                },
+            },
+        )
+        for account_id in account_ids
+    ]
+    reads = [(len(writes), 'GET', '/transactions/', {'params': params})]
+    # Weights so that writes make up `write_ratio` of all requests
+    read_weight = round(len(writes) * (1 - args.write_ratio) / args.write_ratio)
+    reads = [(read_weight, method, url, kwargs) for _, method, url, kwargs in reads]
+    result = asyncio.run(run_mixed_load(app, writes + reads, concurrency=args.concurrency, requests=args.requests))
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--write-ratio', type=float, default=0.3)
+    parser.add_argument('--run-one', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_one:
+        run_one(args)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (name, overrides) in enumerate(CONFIGURATIONS.items()):
+            env = {
+                **os.environ,
+                **overrides,
+                'DB_ENGINE': 'django.db.backends.sqlite3',
+                'DB_NAME': str(Path(directory) / f'bench-{index}.sqlite3'),
+            }
+            command = [sys.executable, '-m', 'benchmarks.sqlite_writes', '--run-one']
+            command += ['--concurrency', str(args.concurrency), '--requests', str(args.requests)]
+            command += ['--write-ratio', str(args.write_ratio)]
+            output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+            results[name] = json.loads(output.splitlines()[-1])
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
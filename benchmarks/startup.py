@@ -0,0 +1,68 @@
+"""
+Cold start of the app: how long `import main` (Django setup, middleware, and routers unless LAZY_ROUTERS is on)
+takes in a fresh interpreter, and which imports cost the most according to `python -X importtime`.
+Exits with status 1 when the median is over the budget, so it can gate CI.
+
+    python -m benchmarks.startup --budget-ms 400
+    LAZY_ROUTERS=False python -m benchmarks.startup --top 30
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import configure_environment
+
+# Prints the milliseconds `import main` took, with `-X importtime` writing the breakdown to stderr
+IMPORT_MAIN = 'import time; started = time.perf_counter(); import main; print((time.perf_counter() - started) * 1000)'
+
+
+def import_main() -> tuple[float, list[tuple[int, int, str]]]:
+    """One cold `import main`: its milliseconds and the (self us, cumulative us, module) rows of -X importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_MAIN],
+        env=os.environ,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, module = line.removeprefix('import time:').split('|')
+        rows.append((int(own), int(cumulative), module[1:].rstrip()))  # Indented two spaces per nesting level
+    return float(result.stdout.splitlines()[-1]), rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000, help='Largest acceptable median `import main`.')
+    parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list.')
+    args = parser.parse_args()
+
+    configure_environment()
+    runs = [import_main() for _ in range(args.runs)]
+    timings = [milliseconds for milliseconds, _ in runs]
+    median = statistics.median(timings)
+
+    # What `import main` pulled in directly, from the fastest run. Rows come children first, so its subtree is
+    # the block between the previous top-level import (interpreter startup) and the `main` row itself.
+    _, rows = min(runs)
+    end = next(index for index, row in enumerate(rows) if row[2] == 'main')
+    start = max((index for index, row in enumerate(rows[:end]) if not row[2].startswith(' ')), default=-1) + 1
+    children = [row for row in rows[start:end] if row[2].startswith('  ') and not row[2].startswith('   ')]
+    print(f'{"import (under main)":<48}{"cumulative ms":>16}')
+    for _, cumulative, module in sorted(children, key=lambda row: row[1], reverse=True)[: args.top]:
+        print(f'{module.strip():<48}{cumulative / 1000:>16.1f}')
+    print(f'\nimport main: median {median:.1f} ms, best {min(timings):.1f} ms over {args.runs} runs')
+
+    if median > args.budget_ms:
+        sys.exit(f'Startup over budget: {median:.1f} ms > {args.budget_ms:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from cache import TTLCache
+
+# Set by middleware.ReplicaRoutingMiddleware for the duration of a request whose reads may go to a replica
+read_from_replica: ContextVar[bool] = ContextVar('read_from_replica', default=False)
+
+# Clients (see middleware.replica_client_key) that wrote recently; their reads stay on the primary until expiry
+recent_writers = TTLCache(maxsize=100_000, ttl=settings.REPLICA_STICKY_SECONDS)
+
+
+class PrimaryReplicaRouter:
+    """
+    Reads go to a random replica while the current request allows it, everything else to the primary.
+
+    Outside of a request that opted in (writes, management commands, the write queue thread), `read_from_replica`
+    is False, so a read that has to see the latest data, like the locked read before an update, stays on the primary.
+    """
+
+    def db_for_read(self, _model, **_hints):
+        if settings.DATABASE_REPLICAS and read_from_replica.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, _model, **_hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, _obj1, _obj2, **_hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, _app_label, **_hints):
+        # Replicas get the schema through replication
+        return db == DEFAULT_DB_ALIAS
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -29,6 +30,52 @@ _db_name = os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3')  # Or ':memory:'
 
 _test_db_name = os.getenv('TEST_DB_NAME', BASE_DIR / 'test_db.sqlite3')  # File path
 
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+if 'sqlite3' in _db_engine:
+    _db_options = {
+        # Seconds a writer waits for the database lock before "database is locked"
+        'timeout': 20,
+    }
+    if _env_bool('SQLITE_PERFORMANCE_MODE', True):
+        _db_options.update(
+            {
+                # Run on every new connection. WAL lets readers work alongside the one writer, NORMAL only
+                # fsyncs at checkpoints (still crash-safe in WAL mode), and the page cache and memory map
+                # keep hot pages out of read() calls.
+                'init_command': ';'.join(
+                    [
+                        'PRAGMA journal_mode=WAL',
+                        'PRAGMA synchronous=NORMAL',
+                        f'PRAGMA mmap_size={_env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)}',
+                        # Negative sizes are KiB: 64 MiB per connection by default
+                        f'PRAGMA cache_size={_env_int("SQLITE_CACHE_SIZE", -64 * 1024)}',
+                        'PRAGMA temp_store=MEMORY',
+                    ]
+                ),
+                # Take the write lock at BEGIN, so a transaction waits on `timeout` for it instead of
+                # failing with "database is locked" when it tries to upgrade a read lock mid-transaction
+                'transaction_mode': 'IMMEDIATE',
+            }
+        )
+else:
+    _db_options = {}
+    # Django's native psycopg 3 pool (needs `psycopg[pool]`), shared by all threads of a worker process
+    if _env_bool('DB_POOL', False):
+        _db_options['pool'] = {
+            'min_size': _env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': _env_int('DB_POOL_MAX_SIZE', 20),
+            # Seconds a request waits for a free connection before failing
+            'timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        }
+
 DATABASES = {
     'default': {
         'ENGINE': _db_engine,
@@ -38,11 +85,12 @@ DATABASES = {
         'PASSWORD': os.getenv('TEST_DB_PASSWORD', os.getenv('DB_PASSWORD')),
         'HOST': os.getenv('TEST_DB_HOST', os.getenv('DB_HOST')),
         'PORT': os.getenv('TEST_DB_PORT', os.getenv('DB_PORT')),
-        'OPTIONS': {
-            # Timeout in seconds (e.g., 15-30 seconds)
-            # Default is often low (e.g., 5 seconds)
-            'timeout': 20,
-        },
+        # Keep each DB thread's connection open across requests instead of reconnecting every time.
+        # A pool manages connection lifetimes itself, and Django requires CONN_MAX_AGE = 0 with one.
+        'CONN_MAX_AGE': 0 if 'pool' in _db_options else _env_int('DB_CONN_MAX_AGE', 60),
+        # Ping a persistent connection before its first use in a request, so a dropped one is replaced
+        'CONN_HEALTH_CHECKS': _env_bool('DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': _db_options,
         'TEST': {
             # THIS IS THE KEY PART FOR PYTEST-DJANGO
             'NAME': _test_db_name,  # Use the file path for tests
@@ -56,6 +104,62 @@ DATABASES = {
 
 # --- End SQLite Configuration ---
 
+# --- Read replicas (optional) ---
+# Comma-separated replica hosts (`host` or `host:port`) and/or database names, e.g. two SQLite files locally.
+# Each replica otherwise shares the primary's settings. GET requests read from them (see config.db_routers).
+_replica_hosts = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+_replica_names = [name.strip() for name in os.getenv('DB_REPLICA_NAMES', '').split(',') if name.strip()]
+if _replica_hosts and _replica_names and len(_replica_hosts) != len(_replica_names):
+    raise ImproperlyConfigured('DB_REPLICA_HOSTS and DB_REPLICA_NAMES must list the same number of replicas.')
+
+DATABASE_REPLICAS = []
+for _index in range(max(len(_replica_hosts), len(_replica_names))):
+    # Tests run against the primary's test database only
+    _replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if _replica_hosts:
+        _host, _, _port = _replica_hosts[_index].partition(':')
+        _replica.update({'HOST': _host, 'PORT': _port or _replica['PORT']})
+    if _replica_names:
+        _replica['NAME'] = _replica_names[_index]
+    DATABASES[f'replica_{_index}'] = _replica
+    DATABASE_REPLICAS.append(f'replica_{_index}')
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['config.db_routers.PrimaryReplicaRouter']
+
+# After a client writes, its reads stay on the primary this long, so it sees its own writes despite replica lag
+REPLICA_STICKY_SECONDS = _env_int('REPLICA_STICKY_SECONDS', 5)
+
+# Funnel transaction writes through one writer thread that commits concurrent writes together (db_app.write_queue).
+# Only meant for SQLite, which has a single writer anyway; other backends handle concurrent writers themselves.
+SQLITE_WRITE_QUEUE = 'sqlite3' in _db_engine and _env_bool('SQLITE_WRITE_QUEUE', False)
+SQLITE_WRITE_QUEUE_MAX_BATCH = _env_int('SQLITE_WRITE_QUEUE_MAX_BATCH', 256)
+
+# Count and time each request's SQL (middleware.QueryStatsMiddleware): Server-Timing headers and `queries` log lines
+QUERY_STATS = _env_bool('QUERY_STATS', True)
+
+# Per-route latency and DB time histograms, bcrypt / JWT timings and thread pool gauges at GET /metrics
+METRICS = _env_bool('METRICS', True)
+
+# Import each router on the first request under its prefix instead of at startup (see lazy_routers)
+LAZY_ROUTERS = _env_bool('LAZY_ROUTERS', True)
+
+# Serve /openapi.json from this file, written by `manage.py export_openapi`, instead of generating it
+OPENAPI_SCHEMA_FILE = Path(os.environ['OPENAPI_SCHEMA_FILE']) if os.getenv('OPENAPI_SCHEMA_FILE') else None
+
+# Serialized GET responses (see http_cache), off unless a backend is given. LocMemCache is per process and only
+# sees invalidations made in that process; with several workers use a shared one, e.g.
+# RESPONSE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache RESPONSE_CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.dummy.DummyCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': _env_int('RESPONSE_CACHE_TIMEOUT', 300),
+        'OPTIONS': {'MAX_ENTRIES': _env_int('RESPONSE_CACHE_MAX_ENTRIES', 10_000)},
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
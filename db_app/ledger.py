@@ -0,0 +1,162 @@
+from collections import defaultdict
+from collections.abc import Hashable
+from datetime import date
+from decimal import Decimal
+from typing import TypeVar
+
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from db_app.models import Account, Budget, Transaction
+from enums import TransactionTypeEnum
+
+AMOUNT_FIELD = DecimalField(max_digits=15, decimal_places=2)
+
+# Transaction fields that decide which balances a transaction moves, and by how much
+BALANCE_FIELDS = frozenset({'amount', 'transaction_type', 'account_id', 'transfer_account_id'})
+# Transaction fields that decide which budgets an expense counts against, and by how much
+BUDGET_FIELDS = frozenset({'amount', 'transaction_type', 'date'})
+
+K = TypeVar('K', bound=Hashable)
+
+
+def transaction_balance_deltas(transaction: Transaction, sign: int = 1) -> dict[int, Decimal]:
+    """
+    How much `transaction` moves each account's balance; pass sign=-1 to get the reversal.
+
+    INCOME adds to `account`, EXPENSE takes from it, and TRANSFER moves money from `transfer_account`
+    (the source, see `Account.outgoing_transfers`) into `account`.
+    """
+    amount = Decimal(transaction.amount) * sign
+    deltas: dict[int, Decimal] = defaultdict(Decimal)
+    if transaction.transaction_type == TransactionTypeEnum.INCOME.value:
+        deltas[transaction.account_id] += amount
+    elif transaction.transaction_type == TransactionTypeEnum.EXPENSE.value:
+        deltas[transaction.account_id] -= amount
+    elif transaction.transaction_type == TransactionTypeEnum.TRANSFER.value:
+        deltas[transaction.account_id] += amount
+        if transaction.transfer_account_id:
+            deltas[transaction.transfer_account_id] -= amount
+    return deltas
+
+
+def transaction_budget_deltas(transaction: Transaction, sign: int = 1) -> dict[date, Decimal]:
+    """How much `transaction` adds to the spent total of budgets covering its day; only expenses count."""
+    if transaction.transaction_type != TransactionTypeEnum.EXPENSE.value:
+        return {}
+    # Freshly created instances still hold whatever was assigned, e.g. a datetime from the API
+    day = Transaction._meta.get_field('date').to_python(transaction.date)
+    return {day: Decimal(transaction.amount) * sign}
+
+
+def merge_deltas(*all_deltas: dict[K, Decimal]) -> dict[K, Decimal]:
+    merged: dict[K, Decimal] = defaultdict(Decimal)
+    for deltas in all_deltas:
+        for key, delta in deltas.items():
+            merged[key] += delta
+    return merged
+
+
+def apply_balance_deltas(user_id: int, deltas: dict[int, Decimal]) -> None:
+    """
+    Move balances with `UPDATE ... SET balance = balance + delta`, so concurrent writers never lose an update.
+    Must run inside transaction.atomic(); raises Account.DoesNotExist if an account is not the user's.
+    """
+    now = timezone.now()
+    # Always the same lock order across writers, so two transfers between the same accounts cannot deadlock
+    for account_id in sorted(deltas):
+        updated = Account.objects.filter(id=account_id, user_id=user_id).update(
+            balance=F('balance') + deltas[account_id], last_modified=now
+        )
+        if not updated:
+            raise Account.DoesNotExist(f'Account {account_id} does not exist.')
+
+
+def apply_budget_deltas(user_id: int, deltas: dict[date, Decimal]) -> None:
+    """
+    Add each day's expense delta to the `spent` total of every budget of the user covering that day.
+    Must run inside transaction.atomic(), next to the transaction write it accounts for.
+    """
+    deltas = {day: delta for day, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    now = timezone.now()
+    if len(deltas) == 1:
+        # The common case, a single transaction: one UPDATE through budget_user_period_idx
+        ((day, delta),) = deltas.items()
+        Budget.objects.filter(user_id=user_id, start_date__lte=day, end_date__gte=day).update(
+            spent=F('spent') + delta, last_modified=now
+        )
+        return
+
+    # Many days (bulk import): attribute them to budgets in Python, then one UPDATE per budget
+    budgets = Budget.objects.filter(user_id=user_id, start_date__lte=max(deltas), end_date__gte=min(deltas))
+    spent: dict[int, Decimal] = defaultdict(Decimal)
+    for budget_id, start_date, end_date in budgets.values_list('id', 'start_date', 'end_date'):
+        for day, delta in deltas.items():
+            if start_date <= day <= end_date:
+                spent[budget_id] += delta
+    for budget_id in sorted(spent):
+        Budget.objects.filter(id=budget_id).update(spent=F('spent') + spent[budget_id], last_modified=now)
+
+
+def signed_amount() -> Case:
+    """`amount` signed by its effect on `account`, for aggregating balances in the database."""
+    return Case(
+        When(transaction_type=TransactionTypeEnum.INCOME.value, then=F('amount')),
+        When(transaction_type=TransactionTypeEnum.EXPENSE.value, then=-F('amount')),
+        When(transaction_type=TransactionTypeEnum.TRANSFER.value, then=F('amount')),
+        default=Value(Decimal('0')),
+        output_field=AMOUNT_FIELD,
+    )
+
+
+def recompute_balances(account_ids: list[int]) -> int:
+    """
+    Rebuild the balances of `account_ids` from their opening balance and transactions,
+    as one `UPDATE` with correlated aggregate subqueries. Returns the number of accounts updated.
+    """
+    incoming = (
+        Transaction.objects.filter(account=OuterRef('pk'))
+        .values('account')
+        .annotate(total=Sum(signed_amount()))
+        .values('total')
+    )
+    outgoing = (
+        Transaction.objects.filter(transfer_account=OuterRef('pk'), transaction_type=TransactionTypeEnum.TRANSFER.value)
+        .values('transfer_account')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    zero = Value(Decimal('0'), output_field=AMOUNT_FIELD)
+    return Account.objects.filter(pk__in=account_ids).update(
+        balance=F('opening_balance')
+        + Coalesce(Subquery(incoming, output_field=AMOUNT_FIELD), zero)
+        - Coalesce(Subquery(outgoing, output_field=AMOUNT_FIELD), zero),
+        last_modified=timezone.now(),
+    )
+
+
+def recompute_budget_spent(budget_ids: list[int]) -> int:
+    """
+    Rebuild the `spent` totals of `budget_ids` from the user's expenses within each budget's dates,
+    as one `UPDATE` with a correlated aggregate subquery. Returns the number of budgets updated.
+    """
+    expenses = (
+        Transaction.objects.filter(
+            user=OuterRef('user'),
+            date__gte=OuterRef('start_date'),
+            date__lte=OuterRef('end_date'),
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+        .order_by()
+        .values('user')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    zero = Value(Decimal('0'), output_field=AMOUNT_FIELD)
+    return Budget.objects.filter(pk__in=budget_ids).update(
+        spent=Coalesce(Subquery(expenses, output_field=AMOUNT_FIELD), zero),
+        last_modified=timezone.now(),
+    )
@@ -0,0 +1,86 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from db_app.models import Account, Budget, Transaction, User
+from routers.transactions import (
+    DEFAULT_PAGE_SIZE,
+    EXPORT_CHUNK_SIZE,
+    TransactionFilters,
+    get_summary_queryset,
+    get_transactions_export_db,
+    get_transactions_page_queryset,
+    type_totals,
+)
+from utils import encode_cursor
+
+# SQLite reports a full table (or full index) walk as "SCAN <table>", an index lookup as "SEARCH <table> ..."
+SQLITE_SCAN = re.compile(r'\bSCAN (db_app_\w+)')
+POSTGRESQL_SCAN = re.compile(r'\bSeq Scan on (db_app_\w+)')
+
+
+def find_sequential_scans(plan: str, vendor: str) -> list[str]:
+    """Return the tables a query plan reads sequentially."""
+    if vendor == 'sqlite':
+        return SQLITE_SCAN.findall(plan)
+    if vendor == 'postgresql':
+        return POSTGRESQL_SCAN.findall(plan)
+    raise CommandError(f'Query plan checks are not supported on {vendor}.')
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the main router queries and fail if any of them falls back to a sequential scan.'
+
+    def handle(self, *_args, **options):
+        sample = Transaction.objects.order_by('id').values('id', 'user_id', 'account_id', 'date').first()
+        if sample is None:
+            raise CommandError('No transactions to plan against, run `manage.py seed_data` first.')
+        user_id = sample['user_id']
+        email = User.objects.filter(id=user_id).values_list('email', flat=True).get()
+        cursor = encode_cursor(sample['date'], sample['id'])
+        after = sample['date'], sample['id']
+
+        # Same query shapes the routers send
+        queries = {
+            'users: by email': User.objects.filter(email=email),
+            'accounts: list': Account.objects.filter(user_id=user_id).order_by('id'),
+            'accounts: detail': Account.objects.filter(id=sample['account_id'], user_id=user_id),
+            'transactions: first page': get_transactions_page_queryset(user_id)[: DEFAULT_PAGE_SIZE + 1],
+            'transactions: next page': get_transactions_page_queryset(user_id, cursor)[: DEFAULT_PAGE_SIZE + 1],
+            'transactions: filtered by date and amount': get_transactions_page_queryset(
+                user_id,
+                cursor,
+                TransactionFilters(date_from=sample['date'], date_to=sample['date'], amount_min=1, amount_max=500),
+            )[: DEFAULT_PAGE_SIZE + 1],
+            'transactions: filtered by account and type': get_transactions_page_queryset(
+                user_id,
+                filters=TransactionFilters(
+                    account_id=sample['account_id'], transaction_type='Expense', description_prefix='Groceries'
+                ),
+            )[: DEFAULT_PAGE_SIZE + 1],
+            'transactions: detail': Transaction.objects.filter(id=sample['id'], user_id=user_id),
+            'transactions: export': get_transactions_export_db(user_id)[:EXPORT_CHUNK_SIZE],
+            'transactions: export, next chunk': get_transactions_export_db(user_id, after)[:EXPORT_CHUNK_SIZE],
+            'transactions: summary by account': get_summary_queryset(user_id, sample['date'], sample['date'])
+            .values('account_id')
+            .annotate(**type_totals()),
+            'budgets: overlapping a date': Budget.objects.filter(
+                user_id=user_id, start_date__lte=sample['date'], end_date__gte=sample['date']
+            ),
+        }
+
+        failures = []
+        for name, queryset in queries.items():
+            plan = queryset.explain()
+            scanned = find_sequential_scans(plan, connection.vendor)
+            if scanned:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'{name}: sequential scan on {", ".join(scanned)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f'{len(failures)} router queries fall back to a sequential scan: {", ".join(failures)}')
@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from fastapi import FastAPI
+
+from lazy_routers import load_routers
+from main import app
+
+
+class Command(BaseCommand):
+    help = 'Write the OpenAPI schema to a file, served instead of generating it when OPENAPI_SCHEMA_FILE points there.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Defaults to OPENAPI_SCHEMA_FILE, else openapi.json.')
+        parser.add_argument('--check', action='store_true', help='Fail if the file is missing or out of date.')
+
+    def handle(self, *_args, **options):
+        path = Path(options['output'] or settings.OPENAPI_SCHEMA_FILE or 'openapi.json')
+        # Always generate from the routes, never from a previously frozen file
+        load_routers(app)
+        app.openapi_schema = None
+        schema = json.dumps(FastAPI.openapi(app), indent=2, sort_keys=True) + '\n'
+
+        if options['check']:
+            if not path.exists() or path.read_text() != schema:
+                raise CommandError(f'{path} is out of date, run `manage.py export_openapi`.')
+            self.stdout.write(f'{path} is up to date.')
+            return
+        path.write_text(schema)
+        self.stdout.write(f'Wrote the OpenAPI schema to {path}.')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from db_app.ledger import recompute_balances
+from db_app.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every account balance from its opening balance and transactions, one aggregated query per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *_args, **options):
+        batch_size = options['batch_size']
+        account_ids = Account.objects.order_by('pk').values_list('pk', flat=True)
+        updated = 0
+        batch = []
+        for account_id in account_ids.iterator(chunk_size=batch_size):
+            batch.append(account_id)
+            if len(batch) == batch_size:
+                updated += recompute_balances(batch)
+                batch = []
+        if batch:
+            updated += recompute_balances(batch)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {updated} account balances.'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from db_app.ledger import recompute_budget_spent
+from db_app.models import Budget
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the spent total of every budget from the expenses in its period, one aggregated query per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *_args, **options):
+        batch_size = options['batch_size']
+        budget_ids = Budget.objects.order_by('pk').values_list('pk', flat=True)
+        updated = 0
+        batch = []
+        for budget_id in budget_ids.iterator(chunk_size=batch_size):
+            batch.append(budget_id)
+            if len(batch) == batch_size:
+                updated += recompute_budget_spent(batch)
+                batch = []
+        if batch:
+            updated += recompute_budget_spent(batch)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {updated} budgets.'))
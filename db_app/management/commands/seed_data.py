@@ -0,0 +1,117 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import bcrypt
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from db_app.models import Account, Transaction, User
+from enums import AccountTypeEnum, TransactionTypeEnum
+
+MERCHANTS = [
+    'Rent',
+    'Groceries',
+    'Coffee shop',
+    'Electricity bill',
+    'Internet',
+    'Gym membership',
+    'Restaurant',
+    'Fuel',
+    'Pharmacy',
+    'Bookstore',
+    'Salary',
+    'Streaming subscription',
+]
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with synthetic users, accounts and transactions (for benchmarks and query plan checks).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--accounts-per-user', type=int, default=3)
+        parser.add_argument('--transactions', type=int, default=100_000, help='Total, spread evenly over the users.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+        parser.add_argument(
+            '--scale',
+            type=int,
+            choices=range(3, 8),
+            help='10^N transactions over 10^(N-3) users (at least 10); overrides --transactions and --users.',
+        )
+
+    def handle(self, *_args, **options):
+        if options['scale']:
+            options['transactions'] = 10 ** options['scale']
+            options['users'] = max(10, 10 ** (options['scale'] - 3))
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        # Every seeded user can log in with the password 'password'
+        password = bcrypt.hashpw(b'password', bcrypt.gensalt(4))
+        run = time.time_ns()
+        users = User.objects.bulk_create(
+            (
+                User(name=f'Seed User {i}', email=f'seed-{run}-{i}@example.com', password=password)
+                for i in range(options['users'])
+            ),
+            batch_size=batch_size,
+        )
+        account_types = [tag.value for tag in AccountTypeEnum]
+        accounts = Account.objects.bulk_create(
+            (
+                Account(user=user, name=f'Account {i}', account_type=rng.choice(account_types))
+                for user in users
+                for i in range(options['accounts_per_user'])
+            ),
+            batch_size=batch_size,
+        )
+        accounts_by_user: dict[int, list[Account]] = {}
+        for account in accounts:
+            accounts_by_user.setdefault(account.user_id, []).append(account)
+
+        today = date.today()
+        transaction_types = [tag.value for tag in TransactionTypeEnum]
+        remaining = options['transactions']
+        while remaining > 0:
+            batch = []
+            for _ in range(min(batch_size, remaining)):
+                user = users[rng.randrange(len(users))]
+                user_accounts = accounts_by_user[user.id]
+                transaction_type = rng.choices(transaction_types, weights=[2, 7, 1])[0]
+                account = rng.choice(user_accounts)
+                transfer_account = None
+                if transaction_type == TransactionTypeEnum.TRANSFER.value and len(user_accounts) > 1:
+                    transfer_account = rng.choice([other for other in user_accounts if other is not account])
+                batch.append(
+                    Transaction(
+                        user=user,
+                        account=account,
+                        transfer_account=transfer_account,
+                        date=today - timedelta(days=rng.randrange(3 * 365)),
+                        amount=Decimal(rng.randrange(100, 500_000)) / 100,
+                        description=f'{rng.choice(MERCHANTS)} #{rng.randrange(10_000)}',
+                        transaction_type=transaction_type,
+                    )
+                )
+            Transaction.objects.bulk_create(batch)
+            remaining -= len(batch)
+
+        # bulk_create bypasses the ledger, so balances and budget totals are rebuilt from the rows afterwards
+        call_command('recompute_balances', batch_size=batch_size, stdout=self.stdout)
+        call_command('reconcile_budgets', batch_size=batch_size, stdout=self.stdout)
+
+        # Fresh statistics, so the planner sees the real table sizes
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Seeded {len(users)} users, {len(accounts)} accounts and {options["transactions"]} transactions '
+                f'in {time.perf_counter() - started:.1f}s.'
+            )
+        )
@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-16 20:43
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_opening_balance(apps, schema_editor):
+    """
+    Balances used to be set by hand and ignored transactions. Keep every balance as it is, and derive the
+    opening balance that makes `opening_balance + transactions == balance`, so a later rebuild is a no-op.
+    """
+    Account = apps.get_model('db_app', 'Account')
+    Transaction = apps.get_model('db_app', 'Transaction')
+    amount_field = models.DecimalField(max_digits=15, decimal_places=2)
+    zero = Value(Decimal('0'), output_field=amount_field)
+
+    signed_amount = Case(
+        When(transaction_type='Income', then=F('amount')),
+        When(transaction_type='Expense', then=-F('amount')),
+        When(transaction_type='Transfer', then=F('amount')),
+        default=zero,
+        output_field=amount_field,
+    )
+    incoming = (
+        Transaction.objects.filter(account=OuterRef('pk'))
+        .values('account')
+        .annotate(total=Sum(signed_amount))
+        .values('total')
+    )
+    outgoing = (
+        Transaction.objects.filter(transfer_account=OuterRef('pk'), transaction_type='Transfer')
+        .values('transfer_account')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    Account.objects.update(
+        opening_balance=F('balance')
+        - Coalesce(Subquery(incoming, output_field=amount_field), zero)
+        + Coalesce(Subquery(outgoing, output_field=amount_field), zero)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_app', '0006_composite_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='opening_balance',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=15),
+        ),
+        migrations.RunPython(backfill_opening_balance, migrations.RunPython.noop),
+    ]
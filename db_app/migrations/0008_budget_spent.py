@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-16 21:05
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_spent(apps, schema_editor):
+    """Total up the expenses already recorded within each budget's dates."""
+    Budget = apps.get_model('db_app', 'Budget')
+    Transaction = apps.get_model('db_app', 'Transaction')
+    amount_field = models.DecimalField(max_digits=15, decimal_places=2)
+
+    expenses = (
+        Transaction.objects.filter(
+            user=OuterRef('user'),
+            date__gte=OuterRef('start_date'),
+            date__lte=OuterRef('end_date'),
+            transaction_type='Expense',
+        )
+        .order_by()
+        .values('user')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    Budget.objects.update(
+        spent=Coalesce(Subquery(expenses, output_field=amount_field), Value(Decimal('0'), output_field=amount_field))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_app', '0007_account_opening_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='spent',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=15),
+        ),
+        migrations.RunPython(backfill_spent, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-16 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_app', '0008_budget_spent'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_account_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'account', '-date', '-id'], name='transaction_user_account_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+FTS_TABLE = 'db_app_transaction_fts'
+SEARCH_INDEX = 'transaction_description_search_idx'
+
+# External content table: the text lives in db_app_transaction only, the FTS5 table holds just the index
+SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        user_id, description, content='db_app_transaction', content_rowid='id'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON db_app_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, user_id, description) VALUES (new.id, new.user_id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON db_app_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_id, description)
+        VALUES ('delete', old.id, old.user_id, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF user_id, description ON db_app_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_id, description)
+        VALUES ('delete', old.id, old.user_id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, user_id, description) VALUES (new.id, new.user_id, new.description);
+    END
+    """,
+    # Index the transactions that already exist
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def search_index(apps):
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Must stay the same expression as the one db_app.search filters on
+    return apps.get_model('db_app', 'Transaction'), GinIndex(
+        SearchVector('description', config='simple'), name=SEARCH_INDEX
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(*search_index(apps))
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(*search_index(apps))
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index over transaction descriptions, for GET /transactions/search. Backend specific, so it is not
+    declared on the model: an FTS5 table kept current by triggers on SQLite, a GIN expression index on PostgreSQL.
+    """
+
+    dependencies = [
+        ('db_app', '0009_transaction_account_index_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -11,6 +11,8 @@ class User(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField(max_length=100, unique=True)
     password = models.BinaryField()  # Store hashed passwords
+    # Signed into every access token; bumping it revokes all tokens issued before
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
 
@@ -27,7 +29,9 @@ class Account(models.Model):
         choices=[(tag.value, tag.name) for tag in AccountTypeEnum],
         default=AccountTypeEnum.CHECKING.value,
     )
+    # Kept up to date by the transaction writes (see db_app.ledger): opening_balance + effect of all transactions
     balance = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    opening_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
@@ -38,7 +42,8 @@ class Transaction(models.Model):
     Represents individual financial transactions.
     """
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Covered by the composite indexes below, which all lead with user_id
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transactions')
     date = models.DateField()
     amount = models.DecimalField(max_digits=15, decimal_places=2)
@@ -58,16 +63,33 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Listing, keyset pagination and export: WHERE user_id = ? ORDER BY date DESC, id DESC
+            models.Index(fields=['user', '-date', '-id'], name='transaction_user_date_id_idx'),
+            # Per-account lookups and account-filtered pages, in the same (date, id) order as the listing
+            models.Index(fields=['user', 'account', '-date', '-id'], name='transaction_user_account_idx'),
+        ]
+
 
 class Budget(models.Model):
     """
     Represents a budget for a category.
     """
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Covered by budget_user_period_idx
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     start_date = models.DateField()
     end_date = models.DateField()
     amount = models.DecimalField(max_digits=15, decimal_places=2)
+    # Kept up to date by the transaction writes (see db_app.ledger): total of the user's expenses in the period
+    spent = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     last_modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Budgets of a user that overlap a date: WHERE user_id = ? AND start_date <= ? AND end_date >= ?
+            models.Index(fields=['user', 'start_date', 'end_date'], name='budget_user_period_idx'),
+        ]
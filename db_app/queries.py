@@ -0,0 +1,57 @@
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import connections, router
+from django.db.models import Model, QuerySet
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+
+def supports_update_returning(using: str) -> bool:
+    """PostgreSQL and SQLite 3.35+ can hand back the updated row from the UPDATE statement itself."""
+    connection = connections[using]
+    return connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert
+
+
+def update_returning(queryset: QuerySet, **values: Any) -> Model | None:
+    """
+    Apply `values` to the first row matched by `queryset` and return it as a model instance, or None if nothing
+    matched. One `UPDATE ... RETURNING` statement where the backend supports it, `UPDATE` + `SELECT` elsewhere.
+    Like QuerySet.update(), this skips save() and signals, and is meant for filters that match a single row.
+    Unlike it, `auto_now` fields are refreshed the way save() would, so `last_modified` (and ETags) move.
+    """
+    model = queryset.model
+    if values:
+        now = timezone.now()
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) and field.name not in values:
+                values[field.name] = now
+    using = queryset._db or router.db_for_write(model)
+    queryset = queryset.using(using)
+    if not values:
+        return queryset.first()
+    if not supports_update_returning(using):
+        return queryset.first() if queryset.update(**values) else None
+
+    connection = connections[using]
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(values)
+    sql, params = query.get_compiler(using).as_sql()
+
+    fields = model._meta.concrete_fields
+    sql = f'{sql} RETURNING {", ".join(connection.ops.quote_name(field.column) for field in fields)}'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    # Run the same backend/field converters a SELECT would (Decimal, datetime, ... on SQLite)
+    compiler = queryset.query.get_compiler(using)
+    converters = compiler.get_converters([field.get_col(model._meta.db_table) for field in fields])
+    row = next(compiler.apply_converters([row], converters)) if converters else row
+    return model.from_db(using, [field.attname for field in fields], row)
+
+
+async def aupdate_returning(queryset: QuerySet, **values: Any) -> Model | None:
+    return await sync_to_async(update_returning)(queryset, **values)
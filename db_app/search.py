@@ -0,0 +1,64 @@
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+from db_app.models import Transaction
+
+# Kept in sync with db_app_transaction by triggers, see migration 0010_transaction_search
+SQLITE_FTS_TABLE = 'db_app_transaction_fts'
+# No stemming or stop words, so both backends match the same word prefixes
+POSTGRESQL_SEARCH_CONFIG = 'simple'
+MAX_SEARCH_TERMS = 10
+
+TERM = re.compile(r'\w+')
+
+# The user_id column narrows the match to one user's rows inside the index itself; weight 0 keeps it out of bm25
+SQLITE_SEARCH_SQL = f"""
+    SELECT rowid, -bm25({SQLITE_FTS_TABLE}, 0.0, 1.0) AS rank
+    FROM {SQLITE_FTS_TABLE}
+    WHERE {SQLITE_FTS_TABLE} MATCH %s
+    ORDER BY rank DESC, rowid DESC
+    LIMIT %s OFFSET %s
+"""
+
+
+def search_terms(query: str) -> list[str]:
+    """The words of a free-text query. Quotes, operators and other syntax are dropped, never passed to the engine."""
+    return TERM.findall(query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_transaction_ids(user_id: int, terms: list[str], limit: int, offset: int = 0) -> list[tuple[int, float]]:
+    """
+    Ids of `user_id`'s transactions whose description has a word starting with each of `terms`, with their rank,
+    best match first (higher rank is better). Served by an FTS5 table on SQLite and a GIN index on PostgreSQL.
+    """
+    using = router.db_for_read(Transaction)
+    vendor = connections[using].vendor
+    if vendor == 'sqlite':
+        # Every term as a quoted prefix, all of them required
+        prefixes = ' '.join(f'"{term}"*' for term in terms)
+        match = f'user_id : "{user_id}" AND description : ({prefixes})'
+        with connections[using].cursor() as cursor:
+            cursor.execute(SQLITE_SEARCH_SQL, [match, limit, offset])
+            return cursor.fetchall()
+
+    transactions = Transaction.objects.using(using).filter(user_id=user_id)
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        # Same expression as transaction_description_search_idx, so the planner can use it
+        vector = SearchVector('description', config=POSTGRESQL_SEARCH_CONFIG)
+        query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms), config=POSTGRESQL_SEARCH_CONFIG, search_type='raw'
+        )
+        transactions = transactions.alias(document=vector).filter(document=query)
+        ranked = transactions.annotate(rank=SearchRank(vector, query)).order_by('-rank', '-id')
+        return list(ranked.values_list('id', 'rank')[offset : offset + limit])
+
+    # No text index on other backends: match every term, newest first
+    condition = Q()
+    for term in terms:
+        condition &= Q(description__icontains=term)
+    ids = transactions.filter(condition).order_by('-date', '-id').values_list('id', flat=True)[offset : offset + limit]
+    return [(pk, 0.0) for pk in ids]
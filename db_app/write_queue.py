@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+T = TypeVar('T')
+
+Job = tuple[Callable[..., Any], tuple, dict, Future, contextvars.Context]
+
+
+class WriteQueue:
+    """
+    Runs write jobs one after another on a single writer thread, committing everything queued together.
+
+    SQLite has one writer at a time. Instead of request threads queueing on the database lock (and failing
+    with "database is locked" once `timeout` runs out), they hand their writes to this thread. It drains
+    whatever has piled up, runs each job in its own savepoint inside one transaction and commits once for
+    the whole batch (group commit). A job that raises only rolls back its own savepoint; every job's future
+    is resolved after the commit, so a caller never sees a result that is not durable yet.
+
+    Each job runs in a copy of its caller's context, as sync_to_async would run it, so its queries count towards
+    the request's QueryStats. The batch's own BEGIN, savepoints and COMMIT belong to no request and are not counted.
+    """
+
+    def __init__(self, max_batch: int = 256):
+        self.max_batch = max_batch
+        self._jobs: queue.SimpleQueue[Job] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        self._jobs.put((func, args, kwargs, future, contextvars.copy_context()))
+        if self._thread is None:
+            self._start()
+        return future
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._jobs.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch: list[Job]) -> None:
+        outcomes: list[tuple[Future, Any, Exception | None]] = []
+        try:
+            # The writer lives outside any request, so expire its connection the way the middleware would
+            close_old_connections()
+            with transaction.atomic():
+                for func, args, kwargs, future, context in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue  # The caller went away before the job started
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, context.run(func, *args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            # Nothing in the batch was committed
+            for _, _, _, future, _ in batch:
+                if future.running():
+                    future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+write_queue = WriteQueue(max_batch=settings.SQLITE_WRITE_QUEUE_MAX_BATCH)
+
+
+async def run_write(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run the sync write `func` through the write queue if SQLITE_WRITE_QUEUE is on,
+    otherwise on the request's DB thread like any other `sync_to_async` call.
+    """
+    if settings.SQLITE_WRITE_QUEUE:
+        return await asyncio.wrap_future(write_queue.submit(func, *args, **kwargs))
+    return await sync_to_async(func)(*args, **kwargs)
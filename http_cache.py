@@ -0,0 +1,105 @@
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+from fastapi import Request, Response
+
+RESPONSE_CACHE = 'responses'
+DISABLED_BACKEND = 'django.core.cache.backends.dummy.DummyCache'
+
+# Clients must revalidate every time, and shared caches must not store per-user data
+CACHE_CONTROL = 'private, no-cache'
+
+Render = Callable[[], Awaitable[tuple[str, Callable[[], bytes]]]]
+
+
+def response_cache_enabled() -> bool:
+    return settings.CACHES[RESPONSE_CACHE]['BACKEND'] != DISABLED_BACKEND
+
+
+def make_etag(versions: Iterable[tuple[int, datetime]], variant: str = '') -> str:
+    """
+    Weak ETag over (id, last_modified) pairs: changes when a row is added, removed or modified.
+    `variant` tells apart representations of the same rows, such as different `fields=` projections.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if variant:
+        digest.update(f'{variant}#'.encode())
+    for pk, last_modified in versions:
+        digest.update(f'{pk}:{last_modified.isoformat()};'.encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 asks for GET."""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return etags == ['*'] or etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in etags}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+
+
+async def _generation(scope: str) -> int:
+    cache = caches[RESPONSE_CACHE]
+    key = f'generation:{scope}'
+    generation = await cache.aget(key)
+    if generation is None:
+        # Start from the clock, so a generation that got evicted never comes back with a number already used
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+async def invalidate_responses(*scopes: str) -> None:
+    """
+    Drop every cached response of `scopes` by moving them to a new generation. A response rendered from data
+    read before the write was committed can then only land under the old generation, where nobody looks.
+    """
+    if not response_cache_enabled():
+        return
+    cache = caches[RESPONSE_CACHE]
+    for scope in scopes:
+        await cache.aadd(f'generation:{scope}', time.time_ns(), timeout=None)
+        await cache.aincr(f'generation:{scope}')
+
+
+async def conditional_json_response(request: Request, scope: str, name: str, render: Render) -> Response:
+    """
+    Answer a GET with an ETag, a 304 if the client already has that version, and the body from the response
+    cache when it is enabled. `render` loads the data and returns its ETag plus a function that serializes it,
+    so a 304 never pays for serialization.
+    """
+    key = None
+    cached = None
+    if response_cache_enabled():
+        key = f'{scope}:{await _generation(scope)}:{name}'
+        cached = await caches[RESPONSE_CACHE].aget(key)
+
+    if cached is not None:
+        etag, body = cached
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    else:
+        etag, serialize = await render()
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        body = serialize()
+        if key is not None:
+            await caches[RESPONSE_CACHE].aset(key, (etag, body))
+    return Response(body, media_type='application/json', headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+
+
+def accounts_scope(user_id: int) -> str:
+    return f'accounts:{user_id}'
+
+
+def transactions_scope(user_id: int) -> str:
+    return f'transactions:{user_id}'
@@ -0,0 +1,55 @@
+import importlib
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+
+class LazyRouter(BaseRoute):
+    """
+    Stands in for the `router` of a module until the first request under `prefix`.
+
+    That request imports the module (its Pydantic models, TypeAdapters and queries with it), puts the router's
+    routes where the placeholder was and dispatches the request again, so later requests never see the placeholder.
+    Loading runs without an await, so no other request can be halfway through the route list meanwhile.
+    """
+
+    def __init__(self, app: FastAPI, prefix: str, module: str):
+        self.app = app
+        self.prefix = prefix
+        self.module = module
+
+    def matches(self, scope):
+        if scope['type'] == 'http':
+            path = scope['path']
+            if path == self.prefix or path.startswith(f'{self.prefix}/'):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params):
+        # Names are only known once loaded; load_routers() first if reverse lookups are needed
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send):
+        self.load()
+        await self.app.router.app(scope, receive, send)
+
+    def load(self) -> None:
+        routes = self.app.router.routes
+        if self not in routes:
+            return  # Already loaded
+        router = importlib.import_module(self.module).router
+        index = routes.index(self)
+        routes.remove(self)
+        loaded_from = len(routes)
+        self.app.include_router(router)
+        # include_router appends; move the new routes to the placeholder's spot to keep the declared order
+        added = routes[loaded_from:]
+        del routes[loaded_from:]
+        routes[index:index] = added
+
+
+def load_routers(app: FastAPI) -> None:
+    """Import every router still waiting behind a LazyRouter, e.g. before generating the OpenAPI schema."""
+    for route in list(app.router.routes):
+        if isinstance(route, LazyRouter):
+            route.load()
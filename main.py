@@ -1,19 +1,58 @@
+import importlib
+import json
 import os
 
 import django
+from django.conf import settings
 from fastapi import FastAPI
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
-from routers.accounts import router as accounts_router  # noqa: E402
-from routers.auth import router as auth_router  # noqa: E402
-from routers.transactions import router as transactions_router  # noqa: E402
-from routers.users import router as users_router  # noqa: E402
+from lazy_routers import LazyRouter, load_routers  # noqa: E402
+from middleware import (  # noqa: E402
+    DjangoRequestContextMiddleware,
+    MetricsMiddleware,
+    QueryStatsMiddleware,
+    ReplicaRoutingMiddleware,
+)
+
+# Router modules by the path prefix their routes live under, in registration order
+ROUTERS = {
+    '/auth': 'routers.auth',
+    '/users': 'routers.users',
+    '/accounts': 'routers.accounts',
+    '/transactions': 'routers.transactions',
+    '/budgets': 'routers.budgets',
+}
+if settings.METRICS:
+    ROUTERS['/metrics'] = 'routers.metrics'
 
 app = FastAPI(title='FastAPI + Django ORM')
+app.add_middleware(DjangoRequestContextMiddleware)
+if settings.DATABASE_REPLICAS:
+    app.add_middleware(ReplicaRoutingMiddleware)
+if settings.QUERY_STATS:
+    app.add_middleware(QueryStatsMiddleware)
+if settings.METRICS:
+    app.add_middleware(MetricsMiddleware)
+
+for prefix, module in ROUTERS.items():
+    if settings.LAZY_ROUTERS:
+        app.router.routes.append(LazyRouter(app, prefix, module))
+    else:
+        app.include_router(importlib.import_module(module).router)
+
+
+def openapi() -> dict:
+    """The schema frozen by `manage.py export_openapi` if configured, else generated (loading every router)."""
+    if app.openapi_schema is None:
+        if settings.OPENAPI_SCHEMA_FILE and settings.OPENAPI_SCHEMA_FILE.exists():
+            app.openapi_schema = json.loads(settings.OPENAPI_SCHEMA_FILE.read_text())
+        else:
+            load_routers(app)
+            FastAPI.openapi(app)
+    return app.openapi_schema
+
 
-app.include_router(auth_router)
-app.include_router(users_router)
-app.include_router(accounts_router)
-app.include_router(transactions_router)
+app.openapi = openapi
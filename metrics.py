@@ -0,0 +1,104 @@
+"""
+In-process metrics in the Prometheus text format, served at /metrics (see routers.metrics).
+
+Everything is recorded from the event loop thread, so plain integer attributes and lists need no lock.
+Durations are integer nanoseconds from `time.perf_counter_ns`, converted to seconds only when scraped.
+Values are per worker process, like the other in-process state; scrape each worker or aggregate them.
+"""
+
+from bisect import bisect_left
+from collections.abc import Iterator
+
+# Bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PASSWORD_HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+TOKEN_VERIFY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+
+
+class Histogram:
+    """Fixed-bucket histogram; `observe` is a bisect and three integer additions."""
+
+    __slots__ = ('bounds', 'le', 'buckets', 'count', 'total')
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = tuple(int(bound * 1_000_000_000) for bound in bounds)
+        self.le = (*(repr(float(bound)) for bound in bounds), '+Inf')
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, nanoseconds: int) -> None:
+        self.buckets[bisect_left(self.bounds, nanoseconds)] += 1
+        self.count += 1
+        self.total += nanoseconds
+
+    def samples(self, name: str, labels: str = '') -> Iterator[str]:
+        prefix = f'{labels},' if labels else ''
+        cumulative = 0
+        for le, count in zip(self.le, self.buckets, strict=True):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}'
+        labels = f'{{{labels}}}' if labels else ''
+        yield f'{name}_sum{labels} {self.total / 1_000_000_000}'
+        yield f'{name}_count{labels} {self.count}'
+
+
+class RouteMetrics:
+    __slots__ = ('labels', 'latency', 'db_time')
+
+    def __init__(self, labels: str):
+        self.labels = labels
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+
+
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        # Keyed by id() of the matched route (set as scope['route'] by FastAPI; routes define __eq__, so are not
+        # hashable), id(None) for requests matching none. Routes live as long as the app, so ids are not reused.
+        self.routes: dict[int, RouteMetrics] = {}
+        self.password_hash = Histogram(PASSWORD_HASH_BUCKETS)
+        self.token_verify = Histogram(TOKEN_VERIFY_BUCKETS)
+
+    def route(self, scope) -> RouteMetrics:
+        """The series of the route that handled `scope`, labelled with its path template, never the raw path."""
+        route = scope.get('route')
+        series = self.routes.get(id(route))
+        if series is None:
+            if route is None:
+                labels = 'method="",route="unmatched"'
+            else:
+                labels = f'method="{",".join(sorted(route.methods))}",route="{route.path}"'
+            series = self.routes[id(route)] = RouteMetrics(labels)
+        return series
+
+    def render(self, gauges: dict[str, tuple[str, int]]) -> str:
+        """The exposition text; `gauges` are sampled at scrape time, as name -> (help, value)."""
+        lines = [
+            '# HELP http_requests_in_flight Requests being handled.',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {self.in_flight}',
+        ]
+        for name, (help_text, value) in gauges.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+
+        routes = list(self.routes.values())
+        for name, help_text, attribute in (
+            ('http_request_duration_seconds', 'Time from request to the end of the response.', 'latency'),
+            ('http_request_db_seconds', 'Time spent running SQL per request.', 'db_time'),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for series in routes:
+                lines.extend(getattr(series, attribute).samples(name, series.labels))
+
+        for name, help_text, histogram in (
+            ('password_hash_seconds', 'bcrypt hash or check, queueing in the pool included.', self.password_hash),
+            ('token_verify_seconds', 'JWT verification of tokens not in the token cache.', self.token_verify),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            lines.extend(histogram.samples(name))
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,334 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any
+from urllib.parse import parse_qs
+
+from asgiref.sync import SyncToAsync, ThreadSensitiveContext
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+
+from config.db_routers import read_from_replica, recent_writers
+from metrics import metrics
+
+# Upper bound on requests talking to the database at the same time (per worker process)
+DB_THREADS = int(os.environ.get('DB_THREADS', '40'))
+
+
+class DBThreadPool:
+    """
+    Up to `size` long-lived single-thread executors, each keeping its own DB connection across requests.
+    A request borrows one only while one of its sync_to_async calls is running (see DBThreadLease); requests
+    beyond the limit queue here, without blocking the event loop.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        # Threads are handed back from the DB threads themselves, so the bookkeeping is under a lock
+        self.lock = threading.Lock()
+        self.idle: list[ThreadPoolExecutor] = []
+        self.started = 0
+        self.waiting: deque[DBThreadLease] = deque()
+
+    @property
+    def busy(self) -> int:
+        return self.started - len(self.idle)
+
+    def acquire(self, lease: 'DBThreadLease') -> ThreadPoolExecutor | None:
+        """A thread for `lease`, or None once it is queued for the next one handed back. Needs the lock."""
+        if self.idle:
+            return self.idle.pop()
+        if self.started < self.size:
+            self.started += 1
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix='django-db')
+        self.waiting.append(lease)
+        return None
+
+    def hand_back(self, executor: ThreadPoolExecutor) -> None:
+        """Pass `executor` on to the request waiting longest, else keep it idle. Needs the lock."""
+        if self.waiting:
+            self.waiting.popleft().attach(executor)
+        else:
+            self.idle.append(executor)
+
+
+db_thread_pool = DBThreadPool(DB_THREADS)
+
+
+class DBThreadLease(Executor):
+    """
+    The executor sync_to_async gets for one request's thread-sensitive calls (every async ORM call).
+
+    It borrows a thread of the pool when a call starts and hands it back as soon as none of the request's calls
+    is left running, so DB_THREADS bounds the requests running queries, not those waiting on a password hash,
+    a slow client or a streamed response. The calls of one request still run one at a time and in order, but not
+    necessarily on the same thread, so nothing that spans calls, like an `aiterator()` cursor, may be left open
+    on a connection (the export reads keyset chunks instead).
+    """
+
+    def __init__(self, pool: DBThreadPool):
+        self.pool = pool
+        self.executor: ThreadPoolExecutor | None = None
+        self.pending: list[Callable[[], None]] = []  # Calls waiting for a thread
+        self.running = 0  # Calls submitted to `executor` and not finished yet
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        call = functools.partial(self._run, future, functools.partial(fn, *args, **kwargs))
+        with self.pool.lock:
+            if self.executor is None and not self.pending:
+                self.executor = self.pool.acquire(self)
+            if self.executor is None:
+                self.pending.append(call)
+                return future
+            self.running += 1
+            self.executor.submit(call)
+        return future
+
+    def attach(self, executor: ThreadPoolExecutor) -> None:
+        """Start the pending calls on `executor`, the thread this request waited for. Needs the lock."""
+        self.executor = executor
+        calls, self.pending = self.pending, []
+        self.running += len(calls)
+        for call in calls:
+            executor.submit(call)
+
+    def _run(self, future: Future, call: Callable[[], Any]) -> None:
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = call()
+                except BaseException as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+        finally:
+            self._finished()
+
+    def _finished(self) -> None:
+        with self.pool.lock:
+            self.running -= 1
+            if self.running:
+                return
+            executor, self.executor = self.executor, None
+        try:
+            # Like Django's request_finished handler, for the connection this request was using: drops it past
+            # CONN_MAX_AGE or after an error, arms the CONN_HEALTH_CHECKS ping and returns pooled connections
+            close_old_connections()
+        finally:
+            with self.pool.lock:
+                self.pool.hand_back(executor)
+
+
+class DjangoRequestContextMiddleware:
+    """
+    Runs the Django async ORM calls of each HTTP request on the pool's DB threads, like Django's ASGIHandler
+    runs them on a thread of the request's own.
+
+    Without a ThreadSensitiveContext, asgiref runs every `afirst()` / `acreate()` / `async for` of every
+    request on a single shared thread, so concurrent requests would queue behind each other's queries.
+    Instead of a fresh thread per request (what ThreadSensitiveContext does on its own), the request gets a
+    DBThreadLease, so long-lived threads and their DB connections are reused across requests, as they were
+    when the handlers ran on AnyIO's worker threads.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async with ThreadSensitiveContext() as context:
+            # ThreadSensitiveContext shuts it down on the way out, a no-op: the pool's threads live on
+            SyncToAsync.context_to_thread_executor[context] = DBThreadLease(db_thread_pool)
+            await self.app(scope, receive, send)
+
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def replica_client_key(scope) -> str | None:
+    """Who is asking: the `user_id` query parameter, else the bearer token. None for anonymous requests."""
+    user_ids = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('user_id')
+    if user_ids:
+        return f'user:{user_ids[0]}'
+    for name, value in scope['headers']:
+        if name == b'authorization':
+            return f'auth:{value.decode("latin-1")}'
+    return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets the reads of GET/HEAD requests go to a read replica (see config.db_routers), with read-your-writes:
+    once a client sends a write, its reads stay on the primary for REPLICA_STICKY_SECONDS.
+
+    Stickiness is per process, like the other in-process caches. Only installed when replicas are configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        client = replica_client_key(scope)
+        if scope['method'] not in SAFE_METHODS:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # The window starts once the write has committed
+                if client is not None:
+                    recent_writers.set(client, True)
+            return
+
+        token = read_from_replica.set(client is None or recent_writers.get(client) is None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            read_from_replica.reset(token)
+
+
+# Queries a request may run before it is logged as over budget (a hint of N+1 or duplicate queries)
+QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', '10'))
+
+logger = logging.getLogger('queries')
+
+
+class QueryStats:
+    """What one request asked of the database. Filled in by `record_query` on whichever thread runs the query."""
+
+    __slots__ = ('count', 'duration', 'slowest', 'slowest_sql', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ''
+        self.statements: set[str] = set()
+
+    @property
+    def duplicates(self) -> int:
+        """Queries whose SQL (parameters aside) already ran in this request: the signature of an N+1."""
+        return self.count - len(self.statements)
+
+
+# Set by QueryStatsMiddleware for the duration of a request; sync_to_async and run_write copy it to their thread
+current_query_stats: ContextVar[QueryStats | None] = ContextVar('current_query_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """A `connection.execute_wrapper` that adds each query to the current request's QueryStats, if any."""
+    stats = current_query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        stats.count += 1
+        stats.duration += duration
+        stats.statements.add(sql)
+        if duration > stats.slowest:
+            stats.slowest = duration
+            stats.slowest_sql = sql
+
+
+def install_query_recorder(connection, **_kwargs) -> None:
+    # Connections are reopened (CONN_MAX_AGE, pools) on the same wrapper object, so only add it once
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts and times the SQL each HTTP request runs, and reports it in a `Server-Timing` header
+    (`db;dur=<ms>;desc="<n> queries"` and the slowest statement as `db-slowest`) and a log line on the
+    `queries` logger. Requests running more than QUERY_BUDGET queries are logged as warnings with the
+    slowest statement.
+
+    The header carries what ran before the response started; for streaming responses the log line has the total.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        connection_created.connect(install_query_recorder, dispatch_uid='query_stats')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                server_timing = (
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                    f'db-slowest;dur={stats.slowest * 1000:.2f}'
+                )
+                message['headers'] = [*message.get('headers', ()), (b'server-timing', server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            metrics.route(scope).db_time.observe(int(stats.duration * 1_000_000_000))
+            log_query_stats(scope, stats)
+
+
+def log_query_stats(scope, stats: QueryStats) -> None:
+    over_budget = stats.count > QUERY_BUDGET
+    if not logger.isEnabledFor(logging.WARNING if over_budget else logging.INFO):
+        return
+    fields = {
+        'method': scope['method'],
+        'path': scope['path'],
+        'queries': stats.count,
+        'duplicates': stats.duplicates,
+        'db_ms': round(stats.duration * 1000, 2),
+        'slowest_ms': round(stats.slowest * 1000, 2),
+    }
+    summary = ' '.join(f'{key}={value}' for key, value in fields.items())
+    if over_budget:
+        logger.warning(
+            'Over query budget (%d): %s slowest_sql=%r', QUERY_BUDGET, summary, stats.slowest_sql, extra=fields
+        )
+    else:
+        logger.info('%s', summary, extra=fields)
+
+
+class MetricsMiddleware:
+    """
+    Records the in-flight count and the latency of each HTTP request, per route template, into `metrics.metrics`.
+    Outermost, so the latency covers the other middleware; the route is known once the request has been routed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        metrics.in_flight += 1
+        started = time.perf_counter_ns()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            metrics.in_flight -= 1
+            metrics.route(scope).latency.observe(time.perf_counter_ns() - started)
@@ -1,12 +1,20 @@
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, TypedDict
 
-from django.db.models import QuerySet
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, BeforeValidator, Field  # For request/response models
+from django.db import transaction as db_transaction
+from django.db.models import F, Max, Min, Value
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter  # For request/response models
 
+from db_app.ledger import AMOUNT_FIELD, recompute_balances, recompute_budget_spent
 from db_app.models import Account as AccountModel
-from enums import AccountTypeEnum
+from db_app.models import Budget as BudgetModel
+from db_app.models import Transaction as TransactionModel
+from db_app.queries import update_returning
+from db_app.write_queue import run_write
+from enums import AccountTypeEnum, TransactionTypeEnum
+from http_cache import accounts_scope, conditional_json_response, invalidate_responses, make_etag, transactions_scope
+from utils import parse_fields
 
 router = APIRouter(
     prefix='/accounts',
@@ -38,72 +46,166 @@ class AccountUpdate(BaseModel):
 class Account(AccountBase):  # For response model
     id: int
 
-    class ConfigDict:
-        # Allow ORM objects to be used directly
-        # Deprecated in Pydantic V2, use from_attributes=True
-        # orm_mode = True
-        from_attributes = True  # Pydantic V2+
+    # Read straight from ORM objects (a nested `class ConfigDict` would be ignored by Pydantic V2)
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AccountRow(TypedDict):
+    """An `Account` as it comes out of `.values()`; same keys, order and JSON as the response model."""
+
+    name: str
+    account_type: str
+    balance: Decimal
+    description: str | None
+    id: int
+
+
+ACCOUNT_FIELDS = tuple(AccountRow.__annotations__)
+
+account_adapter = TypeAdapter(Account)
+# Serializes rows the database already typed, without building (and validating) a model per row
+account_rows_adapter = TypeAdapter(list[AccountRow])
 
 
 # Read All
-def get_all_accounts_db(user_id: int) -> list[AccountModel]:
-    # .all() is lazy, convert to list to execute the query
-    return AccountModel.objects.filter(user_id=user_id)
+async def get_all_accounts_db(user_id: int, fields: tuple[str, ...] = ACCOUNT_FIELDS) -> list[dict]:
+    # Only the requested columns, plus id and last_modified for the ETag, as plain dicts
+    columns = dict.fromkeys((*fields, 'id', 'last_modified'))
+    # A fixed order, so an unchanged list always hashes to the same ETag and serializes the same way
+    accounts = AccountModel.objects.filter(user_id=user_id).order_by('id').values(*columns)
+    return [account async for account in accounts]
 
 
 # Create
-def create_account_db(user_id: int, account_data: AccountBase) -> AccountModel:
-    return AccountModel.objects.create(user_id=user_id, **account_data.model_dump(exclude_none=True))
+async def create_account_db(user_id: int, account_data: AccountBase) -> AccountModel:
+    values = account_data.model_dump(exclude_none=True)
+    # Transactions move the balance from here on
+    values['opening_balance'] = values.get('balance', 0)
+    account = await AccountModel.objects.acreate(user_id=user_id, **values)
+    await invalidate_responses(accounts_scope(user_id))
+    return account
 
 
 # Read One
-def get_account_db(account_id: int, user_id: int) -> QuerySet[AccountModel]:
-    account = AccountModel.objects.filter(id=account_id, user_id=user_id)
-    if not account.first():
+async def get_account_db(account_id: int, user_id: int) -> AccountModel:
+    account = await AccountModel.objects.filter(id=account_id, user_id=user_id).afirst()
+    if account is None:
         raise HTTPException(status_code=404, detail='Account does not found.')
     return account
 
 
 # Update
-def update_account_db(account_id: int, user_id: int, account_data: AccountUpdate) -> AccountModel:
-    existing_account = get_account_db(account_id, user_id=user_id)
-    existing_account.update(**account_data.model_dump(exclude_none=True, exclude={'user_id', 'id'}))
-
-    return existing_account.first()
+def _update_account(account_id: int, user_id: int, values: dict) -> AccountModel | None:
+    accounts = AccountModel.objects.filter(id=account_id, user_id=user_id)
+    if 'balance' not in values:
+        # A single UPDATE ... RETURNING; no match means the account does not exist for this user
+        return update_returning(accounts, **values)
+    with db_transaction.atomic():
+        # Setting the balance by hand is an adjustment of the opening balance, so later rebuilds keep it.
+        # The delta is taken from the balance read under the row lock rather than from `balance` in the SET,
+        # which MySQL would already see updated (it applies SET assignments left to right).
+        balance = accounts.select_for_update().values_list('balance', flat=True).first()
+        if balance is None:
+            return None
+        adjustment = Value(values['balance'] - balance, output_field=AMOUNT_FIELD)
+        values['opening_balance'] = F('opening_balance') + adjustment
+        return update_returning(accounts, **values)
+
+
+async def update_account_db(account_id: int, user_id: int, account_data: AccountUpdate) -> AccountModel:
+    values = account_data.model_dump(exclude_none=True, exclude={'user_id', 'id'})
+    account = await run_write(_update_account, account_id, user_id, values)
+    if account is None:
+        raise HTTPException(status_code=404, detail='Account does not found.')
+    await invalidate_responses(accounts_scope(user_id))
+    return account
 
 
 # Delete
-def delete_account_db(account_id: int, user_id: int):
-    account = get_account_db(account_id, user_id)
-    account.delete()
+def _delete_account(account_id: int, user_id: int) -> bool:
+    with db_transaction.atomic():
+        account = AccountModel.objects.select_for_update().filter(id=account_id, user_id=user_id).first()
+        if account is None:
+            return False
+        # The account's transactions are deleted with it, so whatever they moved elsewhere has to be rebuilt:
+        # the balances of the accounts transfers came from, and the budgets its expenses counted against.
+        transactions = TransactionModel.objects.filter(account_id=account_id)
+        counter_account_ids = set(
+            transactions.filter(transfer_account__isnull=False).values_list('transfer_account_id', flat=True)
+        )
+        counter_account_ids.discard(account_id)
+        expense_dates = transactions.filter(transaction_type=TransactionTypeEnum.EXPENSE.value).aggregate(
+            first=Min('date'), last=Max('date')
+        )
+        budget_ids = []
+        if expense_dates['first'] is not None:
+            budget_ids = list(
+                BudgetModel.objects.filter(
+                    user_id=user_id, start_date__lte=expense_dates['last'], end_date__gte=expense_dates['first']
+                ).values_list('id', flat=True)
+            )
+
+        account.delete()
+        recompute_balances(sorted(counter_account_ids))
+        recompute_budget_spent(budget_ids)
+    return True
+
+
+async def delete_account_db(account_id: int, user_id: int):
+    if not await run_write(_delete_account, account_id, user_id):
+        raise HTTPException(status_code=404, detail='Account does not found.')
+    # The account's transactions went with it, and other balances may have moved
+    await invalidate_responses(accounts_scope(user_id), transactions_scope(user_id))
     return True  # Indicate success
 
 
 @router.get('/', response_model=list[Account])
-def read_accounts(user_id: int = Query(...)):
-    """Retrieve all accounts from the database."""
-    return get_all_accounts_db(user_id)
+async def read_accounts(
+    request: Request,
+    user_id: int = Query(...),
+    fields: str | None = Query(None, description=f'Comma-separated subset of {", ".join(ACCOUNT_FIELDS)}.'),
+):
+    """
+    Retrieve all accounts from the database. Send the ETag back in If-None-Match to get a 304 if unchanged.
+    With `fields`, only those columns are read and returned.
+    """
+    selected = parse_fields(fields, ACCOUNT_FIELDS)
+    variant = ','.join(selected)
+
+    async def render():
+        accounts = await get_all_accounts_db(user_id, selected)
+        etag = make_etag(((account['id'], account['last_modified']) for account in accounts), variant)
+        # Unknown keys (last_modified) are left out by the TypedDict serializer, unselected ones (id) by `include`
+        return etag, lambda: account_rows_adapter.dump_json(accounts, include={'__all__': set(selected)})
+
+    return await conditional_json_response(request, accounts_scope(user_id), f'list:{variant}', render)
 
 
 @router.post('/', response_model=Account, status_code=201)
-def create_account(account_data: AccountBase, user_id: int = Query(...)):
+async def create_account(account_data: AccountBase, user_id: int = Query(...)):
     """Create a new Account in the database."""
-    return create_account_db(user_id, account_data)
+    return await create_account_db(user_id, account_data)
 
 
 @router.get('/{account_id}', response_model=Account)
-def read_account(account_id: int, user_id: int = Query(...)):
-    """Retrieve a specific Account by its ID."""
-    return get_account_db(account_id, user_id).first()
+async def read_account(request: Request, account_id: int, user_id: int = Query(...)):
+    """Retrieve a specific Account by its ID. Send the ETag back in If-None-Match to get a 304 if unchanged."""
+
+    async def render():
+        account = await get_account_db(account_id, user_id)
+        etag = make_etag([(account.id, account.last_modified)])
+        return etag, lambda: account_adapter.dump_json(account_adapter.validate_python(account))
+
+    return await conditional_json_response(request, accounts_scope(user_id), f'detail:{account_id}', render)
 
 
 @router.put('/{account_id}', response_model=Account)
-def update_account(account_id: int, account_data: AccountUpdate, user_id: int = Query(...)):
+async def update_account(account_id: int, account_data: AccountUpdate, user_id: int = Query(...)):
     """Update an existing Account by its ID."""
-    return update_account_db(account_id, user_id, account_data)
+    return await update_account_db(account_id, user_id, account_data)
 
 
 @router.delete('/{account_id}', status_code=204)  # 204 No Content on success
-def delete_account(account_id: int, user_id: int = Query(...)):
+async def delete_account(account_id: int, user_id: int = Query(...)):
     """Delete an Account by its ID."""
-    return delete_account_db(account_id, user_id)
+    return await delete_account_db(account_id, user_id)
@@ -1,12 +1,25 @@
+from dataclasses import dataclass
 from datetime import timedelta
 from typing import Annotated
 
+from django.db.models import F
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 
 from db_app.models import User as UserModel
-from utils import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, is_correct_password
+from db_app.queries import aupdate_returning
+from utils import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    Payload,
+    check_password_async,
+    create_access_token,
+    decode_access_token,
+    forget_user_tokens,
+    hash_password_async,
+    password_needs_rehash,
+    token_versions,
+)
 
 router = APIRouter(
     prefix='/auth',
@@ -15,12 +28,17 @@ router = APIRouter(
 )
 
 
-def authenticate_user(username: str, password: str) -> UserModel | bool:
-    user = UserModel.objects.filter(email=username).first()
+async def authenticate_user(username: str, password: str) -> UserModel | bool:
+    user = await UserModel.objects.filter(email=username).afirst()
     if not user:
         return False
-    if not is_correct_password(password, user.password):
+    if not await check_password_async(password, user.password):
         return False
+    if password_needs_rehash(user.password):
+        # The configured bcrypt cost changed since this hash was made; upgrade it while we have the plain password
+        user.password = await hash_password_async(password)
+        await user.asave(update_fields=['password'])
+        forget_user_tokens(user.id)
     return user
 
 
@@ -29,9 +47,53 @@ class Token(BaseModel):
     token_type: str = 'bearer'
 
 
+@dataclass(slots=True)
+class Principal:
+    """
+    The caller, as described by the signed claims of its access token. Handlers that only need the id or email
+    never touch the `User` row; `routers.users.get_current_user` loads it for those that do.
+    """
+
+    id: int
+    email: str
+    token_version: int
+
+
+async def get_token_version(user_id: int) -> int | None:
+    """The user's current token version, None if the user no longer exists."""
+    version = token_versions.get(user_id)
+    if version is None:
+        version = await UserModel.objects.filter(id=user_id).values_list('token_version', flat=True).afirst()
+        if version is not None:
+            token_versions.set(user_id, version)
+    return version
+
+
+async def get_current_principal(payload: Annotated[Payload, Depends(decode_access_token)]) -> Principal:
+    # A verified (and usually cached) signature plus an in-memory version check: no query on the hot path
+    if await get_token_version(payload.id) != payload.ver:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Token has been revoked',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+    return Principal(id=payload.id, email=payload.email, token_version=payload.ver)
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+async def revoke_user_tokens(user_id: int) -> None:
+    """Invalidate every token issued to the user so far by moving its token version on."""
+    user = await aupdate_returning(UserModel.objects.filter(id=user_id), token_version=F('token_version') + 1)
+    forget_user_tokens(user_id)
+    if user is not None:
+        token_versions.set(user_id, user.token_version)
+
+
 @router.post('/login', response_model=Token)
-def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
-    user = authenticate_user(form_data.username, form_data.password)
+async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,5 +101,13 @@ def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
             headers={'WWW-Authenticate': 'Bearer'},
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(data={'email': user.email, 'id': user.id}, expires_delta=access_token_expires)
+    access_token = create_access_token(
+        data={'email': user.email, 'id': user.id, 'ver': user.token_version}, expires_delta=access_token_expires
+    )
     return Token(access_token=access_token)
+
+
+@router.post('/revoke', status_code=204)
+async def revoke_tokens(principal: CurrentPrincipal):
+    """Log out everywhere: every access token issued to the caller until now stops working."""
+    await revoke_user_tokens(principal.id)
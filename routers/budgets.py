@@ -0,0 +1,176 @@
+from datetime import date
+from decimal import Decimal
+from typing import TypedDict
+
+from asgiref.sync import sync_to_async
+from django.db import transaction as db_transaction
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import (  # For request/response models
+    BaseModel,
+    ConfigDict,
+    Field,
+    TypeAdapter,
+    computed_field,
+    model_validator,
+)
+
+from db_app.ledger import recompute_budget_spent
+from db_app.models import Budget as BudgetModel
+from db_app.queries import update_returning
+
+router = APIRouter(
+    prefix='/budgets',
+    tags=['budgets'],
+    responses={404: {'description': 'Not found'}},
+)
+
+
+class BudgetBase(BaseModel):
+    start_date: date
+    end_date: date
+    amount: Decimal = Field(..., ge=0)
+    description: str | None = ''
+
+    @model_validator(mode='after')
+    def validate_period(self):
+        if self.end_date < self.start_date:
+            raise ValueError('end_date must not be before start_date.')
+        return self
+
+
+class BudgetUpdate(BaseModel):
+    start_date: date | None = None
+    end_date: date | None = None
+    amount: Decimal | None = Field(None, ge=0)
+    description: str | None = None
+
+
+class Budget(BudgetBase):  # For response model
+    id: int
+    spent: Decimal
+
+    @computed_field
+    @property
+    def remaining(self) -> Decimal:
+        return self.amount - self.spent
+
+    # Read straight from ORM objects (a nested `class ConfigDict` would be ignored by Pydantic V2)
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BudgetRow(TypedDict):
+    """A `Budget` row from `.values()` plus `remaining`; same keys, order and JSON as the response model."""
+
+    start_date: date
+    end_date: date
+    amount: Decimal
+    description: str | None
+    id: int
+    spent: Decimal
+    remaining: Decimal
+
+
+BUDGET_RESPONSE_FIELDS = ('start_date', 'end_date', 'amount', 'description', 'id', 'spent')
+
+# Serializes rows the database already typed, without building (and validating) a model per row
+budget_rows_adapter = TypeAdapter(list[BudgetRow])
+
+
+# Read All
+async def get_all_budgets_db(user_id: int, active_on: date | None = None) -> list[dict]:
+    budgets = BudgetModel.objects.filter(user_id=user_id)
+    if active_on:
+        # Served by budget_user_period_idx
+        budgets = budgets.filter(start_date__lte=active_on, end_date__gte=active_on)
+    rows = [budget async for budget in budgets.order_by('start_date', 'id').values(*BUDGET_RESPONSE_FIELDS)]
+    for row in rows:
+        # Computed like `Budget.remaining`; SQLite would lose the scale of a database-side difference
+        row['remaining'] = row['amount'] - row['spent']
+    return rows
+
+
+# Create
+def _create_budget(user_id: int, values: dict) -> BudgetModel:
+    with db_transaction.atomic():
+        budget = BudgetModel.objects.create(user_id=user_id, **values)
+        # Expenses already recorded in the period count from the start; writes keep the total current from here on
+        recompute_budget_spent([budget.id])
+        budget.refresh_from_db(fields=['spent', 'last_modified'])
+    return budget
+
+
+async def create_budget_db(user_id: int, budget_data: BudgetBase) -> BudgetModel:
+    return await sync_to_async(_create_budget)(user_id, budget_data.model_dump(exclude_none=True))
+
+
+# Read One
+async def get_budget_db(budget_id: int, user_id: int) -> BudgetModel:
+    # `spent` is maintained on write, so a read is a single row lookup, never an aggregation
+    budget = await BudgetModel.objects.filter(id=budget_id, user_id=user_id).afirst()
+    if budget is None:
+        raise HTTPException(status_code=404, detail='Budget does not found.')
+    return budget
+
+
+# Update
+def _update_budget(budget_id: int, user_id: int, values: dict) -> BudgetModel | None:
+    budgets = BudgetModel.objects.filter(id=budget_id, user_id=user_id)
+    with db_transaction.atomic():
+        budget = update_returning(budgets, **values)
+        if budget is None:
+            return None
+        if budget.end_date < budget.start_date:
+            raise HTTPException(status_code=422, detail='end_date must not be before start_date.')
+        if 'start_date' in values or 'end_date' in values:
+            # A different period covers different expenses
+            recompute_budget_spent([budget.id])
+            budget.refresh_from_db(fields=['spent', 'last_modified'])
+    return budget
+
+
+async def update_budget_db(budget_id: int, user_id: int, budget_data: BudgetUpdate) -> BudgetModel:
+    values = budget_data.model_dump(exclude_none=True, exclude={'user_id', 'id'})
+    budget = await sync_to_async(_update_budget)(budget_id, user_id, values)
+    if budget is None:
+        raise HTTPException(status_code=404, detail='Budget does not found.')
+    return budget
+
+
+# Delete
+async def delete_budget_db(budget_id: int, user_id: int):
+    deleted, _ = await BudgetModel.objects.filter(id=budget_id, user_id=user_id).adelete()
+    if not deleted:
+        raise HTTPException(status_code=404, detail='Budget does not found.')
+    return True  # Indicate success
+
+
+@router.get('/', response_model=list[Budget])
+async def read_budgets(user_id: int = Query(...), active_on: date | None = Query(None)):
+    """Retrieve all budgets of a user, or only those covering `active_on`."""
+    # `response_model` stays for the OpenAPI schema; returning a Response skips its per-row validation
+    budgets = await get_all_budgets_db(user_id, active_on)
+    return Response(budget_rows_adapter.dump_json(budgets), media_type='application/json')
+
+
+@router.post('/', response_model=Budget, status_code=201)
+async def create_budget(budget_data: BudgetBase, user_id: int = Query(...)):
+    """Create a new Budget; `spent` starts out as the expenses already recorded in its period."""
+    return await create_budget_db(user_id, budget_data)
+
+
+@router.get('/{budget_id}', response_model=Budget)
+async def read_budget(budget_id: int, user_id: int = Query(...)):
+    """Retrieve a specific Budget by its ID, with how much of it has been spent."""
+    return await get_budget_db(budget_id, user_id)
+
+
+@router.put('/{budget_id}', response_model=Budget)
+async def update_budget(budget_id: int, budget_data: BudgetUpdate, user_id: int = Query(...)):
+    """Update an existing Budget by its ID."""
+    return await update_budget_db(budget_id, user_id, budget_data)
+
+
+@router.delete('/{budget_id}', status_code=204)  # 204 No Content on success
+async def delete_budget(budget_id: int, user_id: int = Query(...)):
+    """Delete a Budget by its ID."""
+    return await delete_budget_db(budget_id, user_id)
@@ -0,0 +1,23 @@
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from metrics import metrics
+from middleware import db_thread_pool
+from utils import pending_password_jobs
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """This worker's metrics in the Prometheus text format."""
+    threadpool = current_default_thread_limiter().statistics()
+    gauges = {
+        'db_threads_busy': ('Requests running a query on one of the DB_THREADS threads.', db_thread_pool.busy),
+        'db_threads_waiting': ('Requests queued for a database thread.', len(db_thread_pool.waiting)),
+        'threadpool_busy': ("Threads of AnyIO's default pool in use.", threadpool.borrowed_tokens),
+        'threadpool_waiting': ("Calls queued for AnyIO's default pool.", threadpool.tasks_waiting),
+        'password_jobs_pending': ('bcrypt jobs queued or running in the password pool.', pending_password_jobs()),
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type='text/plain; version=0.0.4')
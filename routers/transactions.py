@@ -1,13 +1,54 @@
-from datetime import datetime
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import date, datetime
 from decimal import Decimal
-from typing import Annotated
-
-from django.db.models import QuerySet
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, BeforeValidator, Field  # For request/response models
+from typing import Annotated, Any, Literal, TypedDict
+
+from asgiref.sync import sync_to_async
+from django.db import transaction as db_transaction
+from django.db.models import Count, Q, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce, Trunc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import (  # For request/response models
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    PlainSerializer,
+    TypeAdapter,
+    ValidationError,
+)
 
+from db_app.ledger import (
+    AMOUNT_FIELD,
+    BALANCE_FIELDS,
+    BUDGET_FIELDS,
+    apply_balance_deltas,
+    apply_budget_deltas,
+    merge_deltas,
+    transaction_balance_deltas,
+    transaction_budget_deltas,
+)
+from db_app.models import Account as AccountModel
 from db_app.models import Transaction as TransactionModel
+from db_app.queries import update_returning
+from db_app.search import search_terms, search_transaction_ids
+from db_app.write_queue import run_write
 from enums import TransactionTypeEnum
+from http_cache import (
+    accounts_scope,
+    conditional_json_response,
+    invalidate_responses,
+    make_etag,
+    transactions_scope,
+)
+from utils import decode_cursor, encode_cursor, parse_fields
 
 router = APIRouter(
     prefix='/transactions',
@@ -33,7 +74,7 @@ class TransactionCreate(BaseModel):
     transaction_type: Annotated[str, BeforeValidator(valid_transaction_type)]
     amount: Decimal
     description: str | None = None
-    date: datetime = Field(default=datetime.now())
+    date: datetime = Field(default_factory=datetime.now)
     account_id: int
     from_account: int | None = None
 
@@ -44,75 +85,635 @@ class TransactionUpdate(BaseModel):
     description: str | None = None
     date: datetime | None = None
     from_account: int | None = None
-    account_id: int
+    account_id: int | None = None
 
 
 class Transaction(TransactionBase):  # For response model
     id: int
 
-    class ConfigDict:
-        from_attributes = True  # Pydantic V2+
+    # Read straight from ORM objects (a nested `class ConfigDict` would be ignored by Pydantic V2)
+    model_config = ConfigDict(from_attributes=True)
+
+
+transaction_adapter = TypeAdapter(Transaction)
+
+
+class TransactionPage(BaseModel):
+    items: list[Transaction]
+    next_cursor: str | None = None
+
+
+def date_as_datetime(value: date) -> str:
+    # The column is a date, but `Transaction.date` has always gone out as a datetime at midnight
+    return datetime(value.year, value.month, value.day).isoformat()
+
+
+class TransactionRow(TypedDict):
+    """A `Transaction` as it comes out of `.values()`; same keys, order and JSON as the response model."""
+
+    date: Annotated[date, PlainSerializer(date_as_datetime, return_type=str)]
+    amount: Decimal
+    description: str | None
+    transaction_type: str
+    id: int
+
+
+class TransactionPageBody(TypedDict):
+    items: list[TransactionRow]
+    next_cursor: str | None
+
+
+TRANSACTION_FIELDS = tuple(TransactionRow.__annotations__)
+
+# Serializes a page straight from the rows the database already typed, without a model per row
+transaction_page_adapter = TypeAdapter(TransactionPageBody)
+
+
+class TransactionHit(Transaction):
+    rank: float
+
+
+class TransactionSearchPage(BaseModel):
+    items: list[TransactionHit]
+    next_offset: int | None = None
+
+
+class TransactionHitRow(TransactionRow):
+    rank: float
+
+
+class TransactionSearchBody(TypedDict):
+    items: list[TransactionHitRow]
+    next_offset: int | None
+
+
+transaction_search_adapter = TypeAdapter(TransactionSearchBody)
+
+
+@dataclass
+class TransactionFilters:
+    """Query parameters narrowing GET /transactions/ (used with `Depends()`); every one given must match."""
 
+    date_from: Annotated[date | None, Query()] = None
+    date_to: Annotated[date | None, Query()] = None
+    account_id: Annotated[int | None, Query()] = None
+    transaction_type: Annotated[str | None, Query(), BeforeValidator(valid_transaction_type)] = None
+    amount_min: Annotated[Decimal | None, Query()] = None
+    amount_max: Annotated[Decimal | None, Query()] = None
+    description_prefix: Annotated[str | None, Query(min_length=1, max_length=100)] = None
 
-# Read All
-def get_all_transactions_db(user_id: int) -> list[TransactionModel]:
-    # .all() is lazy, convert to list to execute the query
-    return TransactionModel.objects.filter(user_id=user_id)
+    def as_q(self) -> Q:
+        lookups = {
+            'date__gte': self.date_from,
+            'date__lte': self.date_to,
+            'account_id': self.account_id,
+            'transaction_type': self.transaction_type,
+            'amount__gte': self.amount_min,
+            'amount__lte': self.amount_max,
+            'description__startswith': self.description_prefix,
+        }
+        return Q(**{lookup: value for lookup, value in lookups.items() if value is not None})
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+# Read All (one keyset page, newest first)
+def get_transactions_page_queryset(
+    user_id: int, cursor: str | None = None, filters: TransactionFilters | None = None
+) -> QuerySet[TransactionModel]:
+    # Served by transaction_user_date_id_idx, or transaction_user_account_idx when filtering on an account.
+    # The filters land in the same WHERE clause, so the date range bounds the index walk too.
+    transactions = TransactionModel.objects.filter(user_id=user_id).order_by('-date', '-id')
+    if filters:
+        transactions = transactions.filter(filters.as_q())
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        # Seek past the last row of the previous page instead of OFFSET-ing into the table
+        transactions = transactions.filter(Q(date__lt=last_date) | Q(date=last_date, id__lt=last_id))
+    return transactions
+
+
+async def get_transactions_page_db(
+    user_id: int,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: tuple[str, ...] = TRANSACTION_FIELDS,
+    filters: TransactionFilters | None = None,
+) -> tuple[list[dict], str | None]:
+    # Only the requested columns, plus date and id for the next cursor
+    columns = dict.fromkeys((*fields, 'date', 'id'))
+    transactions = get_transactions_page_queryset(user_id, cursor, filters).values(*columns)
+
+    # Fetch one extra row to know whether another page exists
+    page = [transaction async for transaction in transactions[: limit + 1]]
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1]['date'], page[-1]['id'])
+    return page, next_cursor
+
+
+# Search
+MAX_SEARCH_OFFSET = 10_000
+
+
+async def search_transactions_db(
+    user_id: int, query: str, limit: int, offset: int = 0
+) -> tuple[list[dict], int | None]:
+    terms = search_terms(query)
+    if not terms:
+        raise HTTPException(status_code=400, detail='Search query has no words.')
+
+    # Ranked ids from the text index, then only those rows; one extra hit tells whether there is another page
+    hits = await sync_to_async(search_transaction_ids)(user_id, terms, limit + 1, offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    ranks = dict(hits[:limit])
+    transactions = TransactionModel.objects.filter(id__in=ranks).values(*TRANSACTION_FIELDS)
+    rows = {row['id']: row async for row in transactions}
+    # In rank order; a transaction deleted in between is skipped
+    return [{**rows[pk], 'rank': rank} for pk, rank in ranks.items() if pk in rows], next_offset
+
+
+# Export
+EXPORT_FIELDS = ('id', 'date', 'amount', 'description', 'transaction_type', 'account_id', 'transfer_account_id')
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def get_transactions_export_db(user_id: int, after: tuple[date, int] | None = None) -> QuerySet:
+    # Plain dicts: no model instances and no Pydantic models per row.
+    # (date, id) order walks transaction_user_date_id_idx, so rows stream without a sort on the server.
+    transactions = TransactionModel.objects.filter(user_id=user_id).order_by('date', 'id')
+    if after:
+        last_date, last_id = after
+        # Seek past the previous chunk, like the list's keyset pages
+        transactions = transactions.filter(Q(date__gt=last_date) | Q(date=last_date, id__gt=last_id))
+    return transactions.values(*EXPORT_FIELDS)
+
+
+async def stream_transactions_export(user_id: int, export_format: Literal['ndjson', 'csv']) -> AsyncIterator[bytes]:
+    """
+    Encode a user's transactions chunk by chunk, so memory stays flat however many rows there are.
+    Each chunk of `EXPORT_CHUNK_SIZE` rows is its own keyset query: no cursor stays open, and no DB thread
+    is held, while a chunk is being written to the client.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == 'csv':
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    after = None
+    while True:
+        chunk = [row async for row in get_transactions_export_db(user_id, after)[:EXPORT_CHUNK_SIZE]]
+        if not chunk:
+            return
+        for row in chunk:
+            if export_format == 'csv':
+                writer.writerow(row.values())
+            else:
+                buffer.write(json.dumps(row, default=str))
+                buffer.write('\n')
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+        after = chunk[-1]['date'], chunk[-1]['id']
+
+
+# Summaries (aggregated in the database, one row per group)
+# Sums come back from SQLite without the column's scale ("5" for 5.00), so they are put back to cents
+Total = Annotated[Decimal, AfterValidator(lambda total: total.quantize(Decimal('0.01')))]
+
+
+class TypeSummary(BaseModel):
+    transaction_type: str
+    total: Total
+    count: int
+
+
+class TypeTotals(BaseModel):
+    income: Total
+    expense: Total
+    transfer: Total
+    count: int
+
+
+class AccountSummary(TypeTotals):
+    account_id: int
+
+
+class PeriodSummary(TypeTotals):
+    period: date
+
+
+def get_summary_queryset(
+    user_id: int, start_date: date | None = None, end_date: date | None = None
+) -> QuerySet[TransactionModel]:
+    # The date range is a range scan on transaction_user_date_id_idx
+    transactions = TransactionModel.objects.filter(user_id=user_id)
+    if start_date:
+        transactions = transactions.filter(date__gte=start_date)
+    if end_date:
+        transactions = transactions.filter(date__lte=end_date)
+    return transactions.order_by()
+
+
+def type_totals() -> dict:
+    """Per-type sums as conditional aggregates, so each group is still a single row."""
+    zero = Value(Decimal('0'), output_field=AMOUNT_FIELD)
+    totals = {
+        tag.name.lower(): Coalesce(Sum('amount', filter=Q(transaction_type=tag.value)), zero)
+        for tag in TransactionTypeEnum
+    }
+    return {**totals, 'count': Count('id')}
+
+
+async def get_summary_by_type_db(user_id: int, start_date: date | None, end_date: date | None) -> list[dict]:
+    summary = (
+        get_summary_queryset(user_id, start_date, end_date)
+        .values('transaction_type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by('transaction_type')
+    )
+    return [row async for row in summary]
+
+
+async def get_summary_by_account_db(user_id: int, start_date: date | None, end_date: date | None) -> list[dict]:
+    summary = (
+        get_summary_queryset(user_id, start_date, end_date)
+        .values('account_id')
+        .annotate(**type_totals())
+        .order_by('account_id')
+    )
+    return [row async for row in summary]
+
+
+async def get_summary_by_period_db(
+    user_id: int, interval: Literal['day', 'week', 'month'], start_date: date | None, end_date: date | None
+) -> list[dict]:
+    summary = (
+        get_summary_queryset(user_id, start_date, end_date)
+        .annotate(period=Trunc('date', interval))
+        .values('period')
+        .annotate(**type_totals())
+        .order_by('period')
+    )
+    return [row async for row in summary]
+
+
+def transaction_values(transaction_data: TransactionCreate | TransactionUpdate) -> dict:
+    values = transaction_data.model_dump(exclude_none=True, exclude={'user_id', 'id'})
+    if 'from_account' in values:
+        # The API calls the source account of a transfer `from_account`, the model `transfer_account`
+        values['transfer_account_id'] = values.pop('from_account')
+    return values
+
+
+account_not_found = HTTPException(status_code=404, detail='Account does not found.')
+
+
+def check_transfer_account(user_id: int, transaction: TransactionModel) -> None:
+    """
+    apply_balance_deltas rejects accounts that are not the user's, but only the ones a transaction moves; the
+    source account stored on any other type than a transfer moves nothing, so it is checked here.
+    """
+    if not transaction.transfer_account_id or transaction.transaction_type == TransactionTypeEnum.TRANSFER.value:
+        return
+    if not AccountModel.objects.filter(id=transaction.transfer_account_id, user_id=user_id).exists():
+        raise AccountModel.DoesNotExist(f'Account {transaction.transfer_account_id} does not exist.')
 
 
 # Create
-def create_transaction_db(user_id: int, transaction_data: TransactionCreate) -> TransactionModel:
-    return TransactionModel.objects.create(user_id=user_id, **transaction_data.model_dump(exclude_none=True))
+def _create_transaction(user_id: int, values: dict) -> TransactionModel:
+    with db_transaction.atomic():
+        transaction = TransactionModel.objects.create(user_id=user_id, **values)
+        check_transfer_account(user_id, transaction)
+        apply_balance_deltas(user_id, transaction_balance_deltas(transaction))
+        apply_budget_deltas(user_id, transaction_budget_deltas(transaction))
+    return transaction
+
+
+async def create_transaction_db(user_id: int, transaction_data: TransactionCreate) -> TransactionModel:
+    try:
+        transaction = await run_write(_create_transaction, user_id, transaction_values(transaction_data))
+    except AccountModel.DoesNotExist:
+        raise account_not_found
+    # Balances moved too
+    await invalidate_responses(transactions_scope(user_id), accounts_scope(user_id))
+    return transaction
+
+
+# Bulk import
+BULK_BATCH_SIZE = 1000
+MAX_BULK_ROWS = 50_000
+# Room for MAX_BULK_ROWS rows of a couple of hundred bytes each
+MAX_BULK_BYTES = 16 * 1024 * 1024
+
+
+class BulkRowError(BaseModel):
+    index: int
+    errors: list[dict[str, Any]]
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    errors: list[BulkRowError]
+
+
+async def read_bulk_body(request: Request) -> bytes:
+    """The request body, refused with a 413 as soon as it is known to be over MAX_BULK_BYTES and before parsing."""
+    too_large = HTTPException(status_code=413, detail=f'At most {MAX_BULK_BYTES} bytes per request.')
+    content_length = request.headers.get('content-length', '')
+    if content_length.isdigit() and int(content_length) > MAX_BULK_BYTES:
+        raise too_large
+    # Chunked bodies have no Content-Length, so the cap is enforced while reading too
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BULK_BYTES:
+            raise too_large
+    return bytes(body)
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list[Any]:
+    """Rows of a JSON array or NDJSON body. An NDJSON line that is not JSON becomes None and fails validation."""
+    if content_type.startswith('application/x-ndjson'):
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                rows.append(None)
+        return rows
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        rows = None
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail='Body must be a JSON array or NDJSON.')
+    return rows
+
+
+def validate_bulk_rows(rows: list[Any]) -> tuple[list[tuple[int, dict]], list[BulkRowError]]:
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, transaction_values(TransactionCreate.model_validate(row))))
+        except ValidationError as e:
+            errors.append(BulkRowError(index=index, errors=e.errors(include_url=False, include_context=False)))
+    return valid, errors
+
+
+def _import_transactions(user_id: int, rows: list[tuple[int, dict]]) -> tuple[int, list[BulkRowError]]:
+    # One query to check every referenced account belongs to the user
+    account_ids = {values['account_id'] for _, values in rows}
+    account_ids |= {values['transfer_account_id'] for _, values in rows if 'transfer_account_id' in values}
+    owned = set(AccountModel.objects.filter(user_id=user_id, id__in=account_ids).values_list('id', flat=True))
+
+    errors, transactions = [], []
+    for index, values in rows:
+        if values['account_id'] not in owned or values.get('transfer_account_id', values['account_id']) not in owned:
+            error = {'type': 'not_found', 'loc': ['account_id'], 'msg': 'Account does not found.'}
+            errors.append(BulkRowError(index=index, errors=[error]))
+            continue
+        transactions.append(TransactionModel(user_id=user_id, **values))
+
+    with db_transaction.atomic():
+        TransactionModel.objects.bulk_create(transactions, batch_size=BULK_BATCH_SIZE)
+        # One balance UPDATE per touched account and one spent UPDATE per touched budget, however many rows
+        apply_balance_deltas(user_id, merge_deltas(*map(transaction_balance_deltas, transactions)))
+        apply_budget_deltas(user_id, merge_deltas(*map(transaction_budget_deltas, transactions)))
+    return len(transactions), errors
+
+
+async def import_transactions_db(user_id: int, rows: list[Any]) -> BulkImportResult:
+    valid, errors = await run_in_threadpool(validate_bulk_rows, rows)
+    created, account_errors = await run_write(_import_transactions, user_id, valid)
+    if created:
+        await invalidate_responses(transactions_scope(user_id), accounts_scope(user_id))
+    errors = sorted(errors + account_errors, key=lambda error: error.index)
+    return BulkImportResult(created=created, errors=errors)
 
 
 # Read One
-def get_transaction_db(transaction_id: int, user_id: int) -> QuerySet[TransactionModel]:
-    transaction = TransactionModel.objects.filter(id=transaction_id, user_id=user_id)
-    if not transaction.first():
+async def get_transaction_db(transaction_id: int, user_id: int) -> TransactionModel:
+    transaction = await TransactionModel.objects.filter(id=transaction_id, user_id=user_id).afirst()
+    if transaction is None:
         raise HTTPException(status_code=404, detail='Transaction does not found.')
     return transaction
 
 
 # Update
-def update_transaction_db(transaction_id: int, user_id: int, transaction_data: TransactionUpdate) -> TransactionModel:
-    existing_transaction = get_transaction_db(transaction_id, user_id=user_id)
-    existing_transaction.update(**transaction_data.model_dump(exclude_none=True, exclude={'user_id', 'id'}))
+def _update_transaction(transaction_id: int, user_id: int, values: dict) -> TransactionModel | None:
+    transactions = TransactionModel.objects.filter(id=transaction_id, user_id=user_id)
+    with db_transaction.atomic():
+        # Lock the row so the balance and budget effects we reverse are the ones actually stored
+        existing_transaction = transactions.select_for_update().first()
+        if existing_transaction is None:
+            return None
+        transaction = update_returning(transactions, **values)
+        check_transfer_account(user_id, transaction)
+        apply_balance_deltas(
+            user_id,
+            merge_deltas(
+                transaction_balance_deltas(existing_transaction, sign=-1),
+                transaction_balance_deltas(transaction),
+            ),
+        )
+        apply_budget_deltas(
+            user_id,
+            merge_deltas(
+                transaction_budget_deltas(existing_transaction, sign=-1),
+                transaction_budget_deltas(transaction),
+            ),
+        )
+    return transaction
+
 
-    return existing_transaction.first()
+async def update_transaction_db(
+    transaction_id: int, user_id: int, transaction_data: TransactionUpdate
+) -> TransactionModel:
+    values = transaction_values(transaction_data)
+    transactions = TransactionModel.objects.filter(id=transaction_id, user_id=user_id)
+    scopes = [transactions_scope(user_id)]
+    if BALANCE_FIELDS.isdisjoint(values) and BUDGET_FIELDS.isdisjoint(values):
+        # Balances and budgets are unaffected: a single UPDATE ... RETURNING
+        transaction = await run_write(update_returning, transactions, **values)
+    else:
+        try:
+            transaction = await run_write(_update_transaction, transaction_id, user_id, values)
+        except AccountModel.DoesNotExist:
+            raise account_not_found
+        scopes.append(accounts_scope(user_id))
+    if transaction is None:
+        raise HTTPException(status_code=404, detail='Transaction does not found.')
+    await invalidate_responses(*scopes)
+    return transaction
 
 
 # Delete
-def delete_transaction_db(transaction_id: int, user_id: int):
-    transaction = get_transaction_db(transaction_id, user_id)
-    transaction.delete()
+def _delete_transaction(transaction_id: int, user_id: int) -> bool:
+    with db_transaction.atomic():
+        transaction = TransactionModel.objects.select_for_update().filter(id=transaction_id, user_id=user_id).first()
+        if transaction is None:
+            return False
+        transaction.delete()
+        apply_balance_deltas(user_id, transaction_balance_deltas(transaction, sign=-1))
+        apply_budget_deltas(user_id, transaction_budget_deltas(transaction, sign=-1))
+    return True
+
+
+async def delete_transaction_db(transaction_id: int, user_id: int):
+    if not await run_write(_delete_transaction, transaction_id, user_id):
+        raise HTTPException(status_code=404, detail='Transaction does not found.')
+    await invalidate_responses(transactions_scope(user_id), accounts_scope(user_id))
     return True  # Indicate success
 
 
-@router.get('/', response_model=list[Transaction])
-def read_transactions(user_id: int = Query(...)):
-    """Retrieve all transactions from the database."""
-    return get_all_transactions_db(user_id)
+@router.get('/', response_model=TransactionPage)
+async def read_transactions(
+    filters: Annotated[TransactionFilters, Depends()],
+    user_id: int = Query(...),
+    cursor: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description=f'Comma-separated subset of {", ".join(TRANSACTION_FIELDS)}.'),
+):
+    """
+    Retrieve one page of transactions, newest first. Pass `next_cursor` back as `cursor` for the next page,
+    together with the same filters. With `fields`, only those columns are read and returned for each item.
+    """
+    selected = parse_fields(fields, TRANSACTION_FIELDS)
+    items, next_cursor = await get_transactions_page_db(user_id, cursor, limit, selected, filters)
+    # `response_model` stays for the OpenAPI schema; returning a Response skips its per-row validation
+    body = transaction_page_adapter.dump_json(
+        {'items': items, 'next_cursor': next_cursor},
+        include={'items': {'__all__': set(selected)}, 'next_cursor': True},
+    )
+    return Response(body, media_type='application/json')
+
+
+@router.get('/search', response_model=TransactionSearchPage)
+async def search_transactions(
+    user_id: int = Query(...),
+    q: str = Query(..., min_length=1, max_length=200, description='Words to look for in the description.'),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=MAX_SEARCH_OFFSET),
+):
+    """
+    Full-text search over a user's transaction descriptions, best match first. Every word of `q` has to match
+    the start of a word in the description. Pass `next_offset` back as `offset` for the next page.
+    """
+    items, next_offset = await search_transactions_db(user_id, q, limit, offset)
+    body = transaction_search_adapter.dump_json({'items': items, 'next_offset': next_offset})
+    return Response(body, media_type='application/json')
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_transactions(
+    user_id: int = Query(...),
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+):
+    """Stream every transaction of a user as NDJSON or CSV."""
+    return StreamingResponse(
+        stream_transactions_export(user_id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="transactions.{export_format}"'},
+    )
+
+
+@router.get('/summary/by-type', response_model=list[TypeSummary])
+async def summarize_by_type(
+    user_id: int = Query(...),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+):
+    """Total and count of a user's transactions per transaction type, optionally within a date range."""
+    return await get_summary_by_type_db(user_id, start_date, end_date)
+
+
+@router.get('/summary/by-account', response_model=list[AccountSummary])
+async def summarize_by_account(
+    user_id: int = Query(...),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+):
+    """Income, expense and transfer totals per account, optionally within a date range."""
+    return await get_summary_by_account_db(user_id, start_date, end_date)
+
+
+@router.get('/summary/by-period', response_model=list[PeriodSummary])
+async def summarize_by_period(
+    user_id: int = Query(...),
+    interval: Literal['day', 'week', 'month'] = Query('month'),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+):
+    """Income, expense and transfer totals per day, week (starting Monday) or month."""
+    return await get_summary_by_period_db(user_id, interval, start_date, end_date)
 
 
 @router.post('/', response_model=Transaction, status_code=201)
-def create_transaction(transaction_data: TransactionCreate, user_id: int = Query(...)):
+async def create_transaction(transaction_data: TransactionCreate, user_id: int = Query(...)):
     """Create a new transaction in the database."""
-    return create_transaction_db(user_id, transaction_data)
+    return await create_transaction_db(user_id, transaction_data)
+
+
+@router.post(
+    '/bulk',
+    response_model=BulkImportResult,
+    status_code=201,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/json': {
+                    'schema': {'type': 'array', 'items': {'$ref': '#/components/schemas/TransactionCreate'}}
+                },
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+            },
+        }
+    },
+)
+async def import_transactions(request: Request, user_id: int = Query(...)):
+    """
+    Create many transactions at once from a JSON array or an NDJSON body.
+    Valid rows are inserted even if others fail; failed rows are reported by index.
+    """
+    body = await read_bulk_body(request)
+    # Parsing and validating tens of thousands of rows is CPU work, kept off the event loop
+    rows = await run_in_threadpool(parse_bulk_body, body, request.headers.get('content-type', ''))
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f'At most {MAX_BULK_ROWS} rows per request.')
+    return await import_transactions_db(user_id, rows)
 
 
 @router.get('/{transaction_id}', response_model=Transaction)
-def read_transaction(transaction_id: int, user_id: int = Query(...)):
-    """Retrieve a specific transaction by its ID."""
-    return get_transaction_db(transaction_id, user_id).first()
+async def read_transaction(request: Request, transaction_id: int, user_id: int = Query(...)):
+    """Retrieve a specific transaction by its ID. Send the ETag back in If-None-Match to get a 304 if unchanged."""
+
+    async def render():
+        transaction = await get_transaction_db(transaction_id, user_id)
+        etag = make_etag([(transaction.id, transaction.last_modified)])
+        return etag, lambda: transaction_adapter.dump_json(transaction_adapter.validate_python(transaction))
+
+    return await conditional_json_response(request, transactions_scope(user_id), f'detail:{transaction_id}', render)
 
 
 @router.put('/{transaction_id}', response_model=Transaction)
-def update_transaction(transaction_id: int, transaction_data: TransactionUpdate, user_id: int = Query(...)):
+async def update_transaction(transaction_id: int, transaction_data: TransactionUpdate, user_id: int = Query(...)):
     """Update an existing transaction by its ID."""
-    return update_transaction_db(transaction_id, user_id, transaction_data)
+    return await update_transaction_db(transaction_id, user_id, transaction_data)
 
 
 @router.delete('/{transaction_id}', status_code=204)  # 204 No Content on success
-def delete_transaction(transaction_id: int, user_id: int = Query(...)):
+async def delete_transaction(transaction_id: int, user_id: int = Query(...)):
     """Delete an transaction by its ID."""
-    return delete_transaction_db(transaction_id, user_id)
+    return await delete_transaction_db(transaction_id, user_id)
@@ -2,15 +2,13 @@ from typing import Annotated
 
 from django.db.utils import IntegrityError
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field, model_validator  # For request/response models
+from pydantic import BaseModel, ConfigDict, Field, model_validator  # For request/response models
 
 from db_app.models import User as UserModel  # Rename to avoid Pydantic clash  # noqa: E402
-from utils import (
-    Payload,
-    decode_access_token,
-    get_hashed_password,
-    is_correct_password,
-)  # noqa: E402
+from db_app.queries import aupdate_returning
+from http_cache import accounts_scope, invalidate_responses, transactions_scope
+from routers.auth import CurrentPrincipal, revoke_user_tokens
+from utils import check_password_async, current_users, forget_user_tokens, hash_password_async  # noqa: E402
 
 router = APIRouter(
     prefix='/users',
@@ -26,22 +24,23 @@ class UserBase(BaseModel):
 
 
 class UserCreate(UserBase):
-    password: bytes
+    password: str
 
     @model_validator(mode='before')
     @classmethod
     def validate_password(cls, values):
+        # Only check presence here: validation runs on the event loop, hashing happens in create_user_db
         password = values.get('password')
         if not password:
             raise ValueError('Password is required')
-
-        values['password'] = get_hashed_password(password)
         return values
 
 
 class UserUpdate(BaseModel):
     name: str | None = None
     email: str | None = None
+    password: str | None = None
+    new_password: str | None = None
 
 
 class ResetPasswordRequest(BaseModel):
@@ -52,81 +51,98 @@ class ResetPasswordRequest(BaseModel):
 class User(UserBase):  # For response model
     id: int
 
-    class ConfigDict:
-        from_attributes = True  # Pydantic V2+
+    # Read straight from ORM objects (a nested `class ConfigDict` would be ignored by Pydantic V2)
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Create
-def create_user_db(user_data: UserCreate) -> UserModel:
+async def create_user_db(user_data: UserCreate) -> UserModel:
+    hashed_password = await hash_password_async(user_data.password)
     try:
-        user = UserModel.objects.create(**user_data.model_dump())
+        user = await UserModel.objects.acreate(**user_data.model_dump(exclude={'password'}), password=hashed_password)
     except IntegrityError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     return user
 
 
-def get_user_from_email(email: str) -> UserModel:
-    try:
-        user = UserModel.objects.get(email=email)
-        return user
-    except UserModel.DoesNotExist as e:
-        raise HTTPException(status_code=404, detail=str(e)) from e
-
-
 # Update
-def update_user_db(existing_user: UserModel, user_data: UserUpdate) -> UserModel:
+async def update_user_db(existing_user: UserModel, user_data: UserUpdate) -> UserModel:
+    values = {
+        'name': user_data.name or existing_user.name,
+        'email': user_data.email or existing_user.email,
+    }
     if user_data.new_password:
-        if not is_correct_password(user_data.password, existing_user.password):
+        if not await check_password_async(user_data.password or '', existing_user.password):
             raise HTTPException(status_code=400, detail='Password does not match.')
-        new_password = get_hashed_password(user_data.new_password)
-        existing_user.password = new_password
+        values['password'] = await hash_password_async(user_data.new_password)
 
-    existing_user.name = user_data.name or existing_user.name
-    existing_user.email = user_data.email or existing_user.email
-    existing_user.save()
+    # Only the columns being changed: never password unless it is, never token_version (that could undo a revocation)
+    try:
+        user = await aupdate_returning(UserModel.objects.filter(id=existing_user.id), **values)
+    except IntegrityError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if user is None:
+        raise HTTPException(status_code=404, detail='User not found')
+    if user_data.new_password:
+        # Tokens issued before the password change stop working
+        await revoke_user_tokens(user.id)
+    else:
+        forget_user_tokens(user.id)
 
-    return existing_user
+    return user
 
 
 # Delete
-def delete_user_db(user: UserModel):
-    user.delete()
+async def delete_user_db(user_id: int):
+    await UserModel.objects.filter(id=user_id).adelete()
+    forget_user_tokens(user_id)
+    # Accounts and transactions were deleted with the user
+    await invalidate_responses(accounts_scope(user_id), transactions_scope(user_id))
     return True
 
 
-def get_current_user(payload: Annotated[Payload, Depends(decode_access_token)]) -> UserModel:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail='Could not validate credentials',
-        headers={'WWW-Authenticate': 'Bearer'},
-    )
-    user = get_user_from_email(payload.email)
+async def get_current_user(principal: CurrentPrincipal) -> UserModel:
+    """
+    The full `User` row of the caller, for handlers that need more than `CurrentPrincipal` carries.
+
+    Cached by id and token version (see `utils.current_users`), so a revoked or re-passworded user is never served
+    from the cache; looked up by id, not by the token's email claim, which is stale once the email changes.
+    """
+    key = (principal.id, principal.token_version)
+    user = current_users.get(key)
     if user is None:
-        raise credentials_exception
+        user = await UserModel.objects.filter(id=principal.id).afirst()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='Could not validate credentials',
+                headers={'WWW-Authenticate': 'Bearer'},
+            )
+        current_users.set(key, user)
     return user
 
 
 @router.post('/', response_model=User, status_code=201)
-def create_user(user_in: UserCreate):
+async def create_user(user_in: UserCreate):
     """Create a new User in the database."""
-    new_user = create_user_db(user_in)
+    new_user = await create_user_db(user_in)
     return new_user
 
 
 @router.get('/me', response_model=User)
-def read_user(current_user: Annotated[UserModel, Depends(get_current_user)]):
+async def read_user(current_user: Annotated[UserModel, Depends(get_current_user)]):
     """Retrieve a specific User by its email."""
     return current_user
 
 
 @router.patch('/', response_model=User)
-def update_user(user_data: UserUpdate, current_user: Annotated[UserModel, Depends(get_current_user)]):
+async def update_user(user_data: UserUpdate, current_user: Annotated[UserModel, Depends(get_current_user)]):
     """Update an existing User by its ID."""
-    updated_user = update_user_db(current_user, user_data)
+    updated_user = await update_user_db(current_user, user_data)
     return updated_user
 
 
 @router.delete('/', status_code=204)  # 204 No Content on success
-def delete_user(current_user: Annotated[UserModel, Depends(get_current_user)]):
+async def delete_user(principal: CurrentPrincipal):
     """Delete a User by its ID."""
-    return delete_user_db(current_user)
+    return await delete_user_db(principal.id)
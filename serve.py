@@ -0,0 +1,198 @@
+"""
+Production entry point: a pre-fork supervisor running several uvicorn workers on one listening socket.
+
+The app is imported once, before forking, so the Django app registry, every router and the OpenAPI schema are
+built a single time and shared copy-on-write by the workers. Each worker opens its own database connections
+(DB_THREADS of them, or its own pool), password hashing processes and in-process caches.
+
+    python serve.py --workers 4 --max-requests 10000
+
+Signals to the supervisor:
+    HUP          start a fresh set of workers, then retire the old ones once they finished their requests.
+                 With --no-preload the new workers import the current code, so this is a zero-downtime reload.
+    TTIN / TTOU  one worker more / fewer.
+    TERM / INT   graceful shutdown.
+"""
+
+import argparse
+import contextlib
+import gc
+import logging
+import os
+import random
+import signal
+import time
+import traceback
+
+import uvicorn
+
+HANDLED_SIGNALS = (signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU, signal.SIGTERM, signal.SIGINT)
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def default_workers() -> int:
+    # CPUs this process may run on, which respects container CPU sets unlike os.cpu_count()
+    return int(os.environ.get('WEB_CONCURRENCY', os.process_cpu_count() or 1))
+
+
+def preload():
+    """Import and fully build the app in the supervisor, so forked workers start with it in shared memory."""
+    from django.db import connections
+
+    import main
+    from lazy_routers import load_routers
+
+    load_routers(main.app)
+    main.app.openapi()
+    # Nothing should have connected yet, but a connection must never be shared across processes
+    connections.close_all()
+    # Keep the garbage collector from touching (and so copying) the preloaded objects in every worker
+    gc.collect()
+    gc.freeze()
+    return main.app
+
+
+class Supervisor:
+    """Keeps `workers` forked uvicorn servers running, replacing any that exit, until told to stop."""
+
+    def __init__(self, config: uvicorn.Config, workers: int, max_requests: int, max_requests_jitter: int):
+        self.config = config
+        self.target = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.workers: dict[int, float] = {}  # pid -> start time
+        self.retiring: dict[int, float] = {}  # pid -> when to stop waiting and SIGKILL it
+        self.signals: list[int] = []
+        self.stopping = False
+
+    def run(self, sock) -> None:
+        self.sock = sock
+        for signum in HANDLED_SIGNALS:
+            signal.signal(signum, lambda signum, _frame: self.signals.append(signum))
+        logger.info('Supervisor %d starting %d workers', os.getpid(), self.target)
+
+        while not self.stopping or self.workers or self.retiring:
+            self.reap()
+            while self.signals:
+                self.handle_signal(self.signals.pop(0))
+            if not self.stopping:
+                while len(self.workers) < self.target:
+                    self.spawn()
+                while len(self.workers) > self.target:
+                    self.retire(min(self.workers, key=self.workers.get))
+            self.kill_overdue()
+            time.sleep(0.1)
+        logger.info('Supervisor %d stopped', os.getpid())
+
+    def handle_signal(self, signum: int) -> None:
+        if signum == signal.SIGHUP:
+            logger.info('Reloading: starting %d new workers', self.target)
+            old = list(self.workers)
+            for _ in range(self.target):
+                self.spawn()
+            for pid in old:
+                self.retire(pid)
+        elif signum == signal.SIGTTIN:
+            self.target += 1
+        elif signum == signal.SIGTTOU:
+            self.target = max(1, self.target - 1)
+        else:
+            logger.info('Shutting down %d workers', len(self.workers))
+            self.stopping = True
+            for pid in list(self.workers):
+                self.retire(pid)
+
+    def spawn(self) -> None:
+        # Jitter keeps workers started together from all recycling at the same moment
+        limit = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else None
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                for signum in HANDLED_SIGNALS:
+                    signal.signal(signum, signal.SIG_DFL)
+                self.config.limit_max_requests = limit
+                # Handles TERM / INT itself: stops accepting, finishes in-flight requests, then exits
+                uvicorn.Server(self.config).run(sockets=[self.sock])
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = time.monotonic()
+
+    def retire(self, pid: int) -> None:
+        self.workers.pop(pid, None)
+        self.retiring[pid] = time.monotonic() + (self.config.timeout_graceful_shutdown or 30) + 5
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGTERM)
+
+    def kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if deadline < now:
+                logger.warning('Worker %d did not stop in time, killing it', pid)
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+                self.retiring[pid] = float('inf')  # Reaped next round
+
+    def reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            self.retiring.pop(pid, None)
+            if started is not None:
+                # Recycled after --max-requests (status 0) or crashed; the main loop starts a replacement
+                logger.info('Worker %d exited (%s), replacing it', pid, os.waitstatus_to_exitcode(status))
+                if time.monotonic() - started < 1:
+                    time.sleep(1)  # Do not spin on a worker that dies during startup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.environ.get('HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=default_workers(), help='Default: WEB_CONCURRENCY or CPUs.')
+    parser.add_argument(
+        '--max-requests',
+        type=int,
+        default=int(os.environ.get('MAX_REQUESTS', '10000')),
+        help='Recycle a worker after this many requests, capping memory growth (0 = never).',
+    )
+    parser.add_argument('--max-requests-jitter', type=int, default=int(os.environ.get('MAX_REQUESTS_JITTER', '1000')))
+    parser.add_argument(
+        '--graceful-timeout',
+        type=int,
+        default=int(os.environ.get('GRACEFUL_TIMEOUT', '30')),
+        help='Seconds a stopping worker gets to finish its requests.',
+    )
+    parser.add_argument('--no-preload', dest='preload', action='store_false', help='Import the app in each worker.')
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    # Split the CPUs between the workers' bcrypt pools instead of giving each worker min(4, CPUs) processes
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, (os.process_cpu_count() or 1) // args.workers)))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    config = uvicorn.Config(
+        preload() if args.preload else 'main:app',
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    sock = config.bind_socket()
+    try:
+        Supervisor(config, args.workers, args.max_requests, args.max_requests_jitter).run(sock)
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    main()
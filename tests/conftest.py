@@ -1,6 +1,6 @@
 import os
 from collections.abc import Generator  # No AsyncGenerator needed
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 
 import django
@@ -11,6 +11,10 @@ from enums import TransactionTypeEnum
 
 # --- Crucial: Set DJANGO_SETTINGS_MODULE early ---
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Cheapest bcrypt cost so password hashing does not dominate the test run
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+# Close each request's connection at its end, so no idle DB thread holds the test database open at teardown
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 # Optionally force test DB settings via environment variables here if needed
 # os.environ['USE_TEST_DB_IN_MEMORY'] = 'True' # Example
 
@@ -20,7 +24,7 @@ django.setup()
 # --- Import your FastAPI app and models AFTER Django setup ---
 from db_app.models import Account, Transaction, User  # noqa: E402
 from main import app as fastapi_app  # noqa: E402
-from utils import get_hashed_password  # noqa: E402
+from utils import create_access_token, current_users, get_hashed_password, token_cache, token_versions  # noqa: E402
 
 
 # --- Fixture for Sync Test Client ---
@@ -35,6 +39,20 @@ def client() -> Generator[TestClient, None, None]:  # Use standard Generator
         yield c
 
 
+@pytest.fixture(autouse=True)
+def clear_token_cache() -> Generator[None, None, None]:
+    """
+    Keeps cached tokens and user snapshots from leaking between tests.
+    """
+    token_cache.clear()
+    token_versions.clear()
+    current_users.clear()
+    yield
+    token_cache.clear()
+    token_versions.clear()
+    current_users.clear()
+
+
 # --- Remove event_loop fixture as it's for asyncio ---
 # @pytest.fixture(scope="session")
 # def event_loop()... (REMOVE THIS)
@@ -80,3 +98,12 @@ def test_transaction(test_user, test_account):
         description='Test Transaction',
         transaction_type=TransactionTypeEnum.EXPENSE.value,
     )
+
+
+@pytest.fixture
+def auth_headers(test_user: User) -> dict[str, str]:
+    """
+    Authorization header carrying a valid access token for test_user.
+    """
+    token = create_access_token({'email': test_user.email, 'id': test_user.id}, expires_delta=timedelta(minutes=5))
+    return {'Authorization': f'Bearer {token}'}
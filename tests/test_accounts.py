@@ -1,10 +1,17 @@
 # tests/test_accounts.py
+from datetime import datetime
 from decimal import Decimal
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test.utils import CaptureQueriesContext
 from fastapi.testclient import TestClient  # Use sync client
 
-from db_app.models import Account, User  #
+from db_app.models import Account, Budget, User  #
+from db_app.queries import supports_update_returning
+from enums import TransactionTypeEnum
+from routers.accounts import AccountUpdate, get_account_db, get_all_accounts_db, update_account_db
 from utils import get_hashed_password
 
 # REMOVE pytestmark = pytest.mark.asyncio
@@ -76,6 +83,43 @@ def test_get_accounts_for_user(client: TestClient, test_user: User, test_account
     assert any(acc['id'] == test_account.id for acc in data)
 
 
+@pytest.mark.django_db(transaction=True)
+def test_get_accounts_in_id_order(client: TestClient, test_user: User, test_account: Account):
+    """The list has a fixed order, so the same rows always give the same body and ETag."""
+    second = Account.objects.create(user=test_user, name='Second', balance='0.00', opening_balance='0.00')
+    # Moved last by the storage order of some backends (a PostgreSQL UPDATE writes a new row version)
+    Account.objects.filter(id=test_account.id).update(name='Updated')
+
+    response = client.get('/accounts/', params={'user_id': test_user.id})
+    assert [account['id'] for account in response.json()] == [test_account.id, second.id]
+
+    with CaptureQueriesContext(connection) as queries:
+        async_to_sync(get_all_accounts_db)(test_user.id)
+    assert 'ORDER BY' in queries[-1]['sql']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_accounts_matches_detail_format(client: TestClient, test_user: User, test_account: Account):
+    """The list is serialized from `.values()` rows; each item must look exactly like the detail response."""
+    data = client.get('/accounts/', params={'user_id': test_user.id}).json()
+    detail = client.get(f'/accounts/{test_account.id}', params={'user_id': test_user.id}).json()
+    assert data == [detail]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_accounts_fields(client: TestClient, test_user: User, test_account: Account):
+    """`fields` trims every item to the requested columns and gets its own ETag."""
+    response = client.get('/accounts/', params={'user_id': test_user.id, 'fields': 'balance,name'})
+    assert response.status_code == 200
+    assert response.json() == [{'name': test_account.name, 'balance': '100.50'}]
+
+    full = client.get('/accounts/', params={'user_id': test_user.id})
+    assert full.headers['etag'] != response.headers['etag']
+
+    response = client.get('/accounts/', params={'user_id': test_user.id, 'fields': 'name,opening_balance'})
+    assert response.status_code == 400
+
+
 @pytest.mark.django_db(transaction=True)
 def test_update_account(client: TestClient, test_user: User, test_account: Account):
     """Test updating an existing account."""
@@ -179,6 +223,36 @@ def test_update_account_wrong_user(client: TestClient, test_account: Account):
     assert response.status_code == 404  # Expect 404 if update function checks user ownership
 
 
+@pytest.mark.django_db(transaction=True)
+def test_delete_account_rebuilds_other_balances_and_budgets(client: TestClient, test_user: User):
+    """Test deleting an account undoes what its transactions did to other accounts and to budgets."""
+    checking = Account.objects.create(user=test_user, name='Checking', balance='100.00', opening_balance='100.00')
+    savings = Account.objects.create(user=test_user, name='Savings', balance='200.00', opening_balance='200.00')
+    params = {'user_id': test_user.id}
+    budget = client.post(
+        '/budgets/', params=params, json={'start_date': '2025-03-01', 'end_date': '2025-03-31', 'amount': '100.00'}
+    ).json()
+    rows = [
+        # Savings -> Checking
+        {'account_id': checking.id, 'from_account': savings.id, 'transaction_type': TransactionTypeEnum.TRANSFER.value},
+        {'account_id': checking.id, 'transaction_type': TransactionTypeEnum.EXPENSE.value},
+        {'account_id': savings.id, 'transaction_type': TransactionTypeEnum.EXPENSE.value},
+    ]
+    for row, amount in zip(rows, ('50.00', '20.00', '5.00'), strict=True):
+        data = {**row, 'amount': amount, 'description': '', 'date': '2025-03-10T12:00:00'}
+        assert client.post('/transactions/', params=params, json=data).status_code == 201
+    savings.refresh_from_db()
+    assert savings.balance == Decimal('145.00')
+    assert Budget.objects.get(id=budget['id']).spent == Decimal('25.00')
+
+    assert client.delete(f'/accounts/{checking.id}', params=params).status_code == 204
+
+    # The transfer out of savings and the expense on checking were deleted with checking
+    savings.refresh_from_db()
+    assert savings.balance == Decimal('195.00')
+    assert Budget.objects.get(id=budget['id']).spent == Decimal('5.00')
+
+
 @pytest.mark.django_db(transaction=True)
 def test_delete_account_not_found(client: TestClient, test_user: User):
     """Test deleting an account ID that does not exist."""
@@ -218,3 +292,74 @@ def test_get_all_accounts_for_user_empty(client: TestClient):
     data = response.json()
     assert isinstance(data, list)
     assert len(data) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_account_helpers_query_counts(test_user: User, test_account: Account, django_assert_num_queries):
+    """Test reading an account is one query and updating it one statement where RETURNING is supported."""
+    with django_assert_num_queries(1):
+        account = async_to_sync(get_account_db)(test_account.id, test_user.id)
+    assert account.id == test_account.id
+
+    update_data = AccountUpdate(name='Single Round Trip')
+    with django_assert_num_queries(1 if supports_update_returning(DEFAULT_DB_ALIAS) else 2):
+        account = async_to_sync(update_account_db)(test_account.id, test_user.id, update_data)
+    assert account.id == test_account.id
+    assert account.name == 'Single Round Trip'
+    assert isinstance(account.created_at, datetime)
+
+    # A new balance is an adjustment of the opening balance, from the balance read under the row lock
+    account = async_to_sync(update_account_db)(test_account.id, test_user.id, AccountUpdate(balance='42.10'))
+    assert account.balance == Decimal('42.10')
+    assert account.opening_balance == Decimal('-58.40')  # 0.00 + 42.10 - 100.50
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_accounts_conditional(client: TestClient, test_user: User, test_account: Account):
+    response = client.get('/accounts/', params={'user_id': test_user.id})
+    assert response.status_code == 200
+    etag = response.headers['etag']
+
+    response = client.get('/accounts/', params={'user_id': test_user.id}, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+
+    # Any change to an account gives the list a new ETag
+    client.put(f'/accounts/{test_account.id}', params={'user_id': test_user.id}, json={'name': 'Renamed'})
+    response = client.get('/accounts/', params={'user_id': test_user.id}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert response.json()[0]['name'] == 'Renamed'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_account_response_cache(settings, client: TestClient, test_user: User, test_account: Account):
+    settings.CACHES = {
+        **settings.CACHES,
+        'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-responses'},
+    }
+    url = f'/accounts/{test_account.id}'
+    first = client.get(url, params={'user_id': test_user.id})
+    assert first.status_code == 200
+
+    # Served from the cache: a change made behind the routers' back is not seen...
+    Account.objects.filter(id=test_account.id).update(name='Behind the back')
+    cached = client.get(url, params={'user_id': test_user.id})
+    assert cached.json() == first.json()
+    assert (
+        client.get(url, params={'user_id': test_user.id}, headers={'If-None-Match': first.headers['etag']}).status_code
+        == 304
+    )
+
+    # ...while a write through the routers invalidates it
+    transaction = {
+        'amount': '10.00',
+        'description': 'Coffee',
+        'account_id': test_account.id,
+        'transaction_type': 'Expense',
+    }
+    assert client.post('/transactions/', params={'user_id': test_user.id}, json=transaction).status_code == 201
+    fresh = client.get(url, params={'user_id': test_user.id})
+    assert fresh.headers['etag'] != first.headers['etag']
+    assert Decimal(fresh.json()['balance']) == Decimal('90.50')
@@ -0,0 +1,90 @@
+# tests/test_auth.py
+import bcrypt
+import pytest
+from asgiref.sync import async_to_sync
+from fastapi.testclient import TestClient
+
+import utils
+from db_app.models import User
+from routers.auth import get_current_principal
+from utils import BCRYPT_ROUNDS, decode_access_token, is_correct_password
+
+
+@pytest.mark.django_db(transaction=True)
+def test_login(client: TestClient, test_user: User):
+    """Test logging in with valid credentials returns a bearer token."""
+    response = client.post('/auth/login', data={'username': test_user.email, 'password': 'testpassword'})
+    assert response.status_code == 200
+    data = response.json()
+    assert data['token_type'] == 'bearer'
+    assert data['access_token']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_login_wrong_password(client: TestClient, test_user: User):
+    """Test logging in with a wrong password is rejected."""
+    response = client.post('/auth/login', data={'username': test_user.email, 'password': 'not-the-password'})
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_login_rehashes_password_with_new_cost(client: TestClient, test_user: User):
+    """Test a hash made with another bcrypt cost is upgraded on successful login."""
+    old_rounds = BCRYPT_ROUNDS + 1
+    test_user.password = bcrypt.hashpw(b'testpassword', bcrypt.gensalt(old_rounds))
+    test_user.save()
+
+    response = client.post('/auth/login', data={'username': test_user.email, 'password': 'testpassword'})
+    assert response.status_code == 200
+
+    test_user.refresh_from_db()
+    assert bytes(test_user.password).split(b'$')[2] == b'%02d' % BCRYPT_ROUNDS
+    assert is_correct_password('testpassword', test_user.password)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_login_sheds_load_when_password_pool_is_full(client: TestClient, test_user: User, monkeypatch):
+    """Test password work is refused with 503 once the admission limit is reached."""
+    monkeypatch.setattr(utils, 'PASSWORD_HASH_MAX_PENDING', 0)
+
+    response = client.post('/auth/login', data={'username': test_user.email, 'password': 'testpassword'})
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '1'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_principal_needs_no_query_once_version_is_known(test_user: User, auth_headers, django_assert_num_queries):
+    """Test resolving the caller is a token check plus a version lookup that is cached after the first request."""
+    token = auth_headers['Authorization'].removeprefix('Bearer ')
+
+    def resolve():
+        payload = async_to_sync(decode_access_token)(token)
+        return async_to_sync(get_current_principal)(payload)
+
+    with django_assert_num_queries(1):
+        principal = resolve()
+    assert (principal.id, principal.email) == (test_user.id, test_user.email)
+    with django_assert_num_queries(0):
+        resolve()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_revoke_tokens(client: TestClient, test_user: User):
+    """Test /auth/revoke invalidates every token issued so far, while new logins keep working."""
+
+    def login() -> dict[str, str]:
+        response = client.post('/auth/login', data={'username': test_user.email, 'password': 'testpassword'})
+        return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+    first, second = login(), login()
+    assert client.get('/users/me', headers=second).status_code == 200
+
+    assert client.post('/auth/revoke', headers=first).status_code == 204
+    for headers in (first, second):
+        response = client.get('/users/me', headers=headers)
+        assert response.status_code == 401
+        assert response.json()['detail'] == 'Token has been revoked'
+
+    assert client.get('/users/me', headers=login()).status_code == 200
+    test_user.refresh_from_db()
+    assert test_user.token_version == 1
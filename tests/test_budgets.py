@@ -0,0 +1,154 @@
+# tests/test_budgets.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from fastapi.testclient import TestClient
+
+from db_app.models import Account, Budget, Transaction, User
+from enums import TransactionTypeEnum
+from routers.budgets import get_budget_db
+
+
+def create_budget_via_api(client: TestClient, user: User, start_date: str, end_date: str, amount: str) -> dict:
+    data = {'start_date': start_date, 'end_date': end_date, 'amount': amount, 'description': 'Groceries'}
+    response = client.post('/budgets/', params={'user_id': user.id}, json=data)
+    assert response.status_code == 201
+    return response.json()
+
+
+def expense_via_api(client: TestClient, user: User, account: Account, day: str, amount: str) -> dict:
+    data = {
+        'amount': amount,
+        'description': 'Groceries',
+        'date': f'{day}T12:00:00',
+        'account_id': account.id,
+        'transaction_type': TransactionTypeEnum.EXPENSE.value,
+    }
+    response = client.post('/transactions/', params={'user_id': user.id}, json=data)
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_budget_counts_existing_expenses(client: TestClient, test_user: User, test_account: Account):
+    Transaction.objects.create(
+        user=test_user,
+        account=test_account,
+        date=date(2025, 3, 10),
+        amount=Decimal('12.50'),
+        transaction_type=TransactionTypeEnum.EXPENSE.value,
+    )
+    budget = create_budget_via_api(client, test_user, '2025-03-01', '2025-03-31', '100.00')
+    assert Decimal(budget['spent']) == Decimal('12.50')
+    assert Decimal(budget['remaining']) == Decimal('87.50')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_invalid_budget_period(client: TestClient, test_user: User):
+    data = {'start_date': '2025-03-31', 'end_date': '2025-03-01', 'amount': '10.00'}
+    response = client.post('/budgets/', params={'user_id': test_user.id}, json=data)
+    assert response.status_code == 422
+
+
+@pytest.mark.django_db(transaction=True)
+def test_budget_spent_follows_transaction_writes(client: TestClient, test_user: User, test_account: Account):
+    march = create_budget_via_api(client, test_user, '2025-03-01', '2025-03-31', '100.00')
+    quarter = create_budget_via_api(client, test_user, '2025-01-01', '2025-03-31', '300.00')
+
+    def spent(budget: dict) -> Decimal:
+        return Budget.objects.get(id=budget['id']).spent
+
+    first = expense_via_api(client, test_user, test_account, '2025-03-05', '20.00')
+    expense_via_api(client, test_user, test_account, '2025-02-05', '5.00')
+    assert spent(march) == Decimal('20.00')
+    assert spent(quarter) == Decimal('25.00')
+
+    # Income never counts against a budget
+    response = client.post(
+        '/transactions/',
+        params={'user_id': test_user.id},
+        json={
+            'amount': '50.00',
+            'description': 'Salary',
+            'date': '2025-03-06T00:00:00',
+            'account_id': test_account.id,
+            'transaction_type': 'Income',
+        },
+    )
+    assert response.status_code == 201
+    assert spent(march) == Decimal('20.00')
+
+    # Moving an expense out of March takes it off the March budget only
+    response = client.put(
+        f'/transactions/{first["id"]}', params={'user_id': test_user.id}, json={'date': '2025-01-15T00:00:00'}
+    )
+    assert response.status_code == 200
+    assert spent(march) == Decimal('0.00')
+    assert spent(quarter) == Decimal('25.00')
+
+    assert client.delete(f'/transactions/{first["id"]}', params={'user_id': test_user.id}).status_code == 204
+    assert spent(quarter) == Decimal('5.00')
+
+    rows = [
+        {'amount': '1.00', 'date': '2025-03-01T00:00:00', 'account_id': test_account.id, 'transaction_type': 'Expense'},
+        {'amount': '2.00', 'date': '2025-01-01T00:00:00', 'account_id': test_account.id, 'transaction_type': 'Expense'},
+    ]
+    response = client.post('/transactions/bulk', params={'user_id': test_user.id}, json=rows)
+    assert response.status_code == 201
+    assert spent(march) == Decimal('1.00')
+    assert spent(quarter) == Decimal('8.00')
+
+    # The reconcile job rebuilds the same totals from scratch
+    Budget.objects.update(spent=0)
+    call_command('reconcile_budgets', stdout=None)
+    assert spent(march) == Decimal('1.00')
+    assert spent(quarter) == Decimal('8.00')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_update_budget_period_recomputes_spent(client: TestClient, test_user: User, test_account: Account):
+    budget = create_budget_via_api(client, test_user, '2025-03-01', '2025-03-31', '100.00')
+    expense_via_api(client, test_user, test_account, '2025-04-02', '7.00')
+
+    response = client.put(f'/budgets/{budget["id"]}', params={'user_id': test_user.id}, json={'end_date': '2025-04-30'})
+    assert response.status_code == 200
+    assert Decimal(response.json()['spent']) == Decimal('7.00')
+
+    response = client.put(f'/budgets/{budget["id"]}', params={'user_id': test_user.id}, json={'end_date': '2025-02-01'})
+    assert response.status_code == 422
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_and_delete_budgets(client: TestClient, test_user: User):
+    march = create_budget_via_api(client, test_user, '2025-03-01', '2025-03-31', '100.00')
+    create_budget_via_api(client, test_user, '2025-04-01', '2025-04-30', '100.00')
+
+    response = client.get('/budgets/', params={'user_id': test_user.id, 'active_on': '2025-03-15'})
+    assert response.status_code == 200
+    assert [budget['id'] for budget in response.json()] == [march['id']]
+    assert len(client.get('/budgets/', params={'user_id': test_user.id}).json()) == 2
+
+    assert client.delete(f'/budgets/{march["id"]}', params={'user_id': test_user.id}).status_code == 204
+    assert client.get(f'/budgets/{march["id"]}', params={'user_id': test_user.id}).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_budgets_matches_detail_format(client: TestClient, test_user: User, test_account: Account):
+    budget = create_budget_via_api(client, test_user, '2025-03-01', '2025-03-31', '100.00')
+    expense_via_api(client, test_user, test_account, '2025-03-10', '12.50')
+
+    detail = client.get(f'/budgets/{budget["id"]}', params={'user_id': test_user.id}).json()
+    assert detail['remaining'] == '87.50'
+    assert client.get('/budgets/', params={'user_id': test_user.id}).json() == [detail]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_budget_read_is_a_single_query(test_user: User, django_assert_num_queries):
+    budget = Budget.objects.create(
+        user=test_user, start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), amount=Decimal('10.00')
+    )
+    with django_assert_num_queries(1):
+        async_to_sync(get_budget_db)(budget.id, test_user.id)
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+
+from config.db_routers import PrimaryReplicaRouter, read_from_replica, recent_writers
+from db_app.models import Account
+from middleware import ReplicaRoutingMiddleware
+
+
+@pytest.fixture(autouse=True)
+def clear_recent_writers():
+    recent_writers.clear()
+    yield
+    recent_writers.clear()
+
+
+def test_router_reads_from_replica_only_when_allowed(settings):
+    settings.DATABASE_REPLICAS = ['replica_0']
+    router = PrimaryReplicaRouter()
+
+    assert router.db_for_read(Account) == DEFAULT_DB_ALIAS
+    token = read_from_replica.set(True)
+    try:
+        assert router.db_for_read(Account) == 'replica_0'
+        assert router.db_for_write(Account) == DEFAULT_DB_ALIAS
+    finally:
+        read_from_replica.reset(token)
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, 'db_app')
+    assert not router.allow_migrate('replica_0', 'db_app')
+
+
+def test_replica_routing_middleware_sticks_writers_to_primary():
+    seen = []
+
+    async def app(*_asgi):
+        seen.append(read_from_replica.get())
+
+    middleware = ReplicaRoutingMiddleware(app)
+
+    def request(method: str, user_id: int) -> bool:
+        scope = {'type': 'http', 'method': method, 'query_string': f'user_id={user_id}'.encode(), 'headers': []}
+        asyncio.run(middleware(scope, None, None))
+        return seen[-1]
+
+    assert request('GET', 1) is True
+    assert request('POST', 1) is False  # Writes always read from the primary
+    assert request('GET', 1) is False  # Read-your-writes: user 1 stays on the primary for a while
+    assert request('GET', 2) is True
+    recent_writers.clear()  # The window expired
+    assert request('GET', 1) is True
@@ -0,0 +1,65 @@
+# tests/test_db_threads.py
+import asyncio
+import threading
+
+from asgiref.sync import SyncToAsync, ThreadSensitiveContext, sync_to_async
+
+from middleware import DBThreadLease, DBThreadPool
+
+
+async def in_request(pool: DBThreadPool, work):
+    """Run `work` the way DjangoRequestContextMiddleware runs a request."""
+    async with ThreadSensitiveContext() as context:
+        SyncToAsync.context_to_thread_executor[context] = DBThreadLease(pool)
+        return await work()
+
+
+def test_db_thread_is_only_held_while_a_call_runs():
+    """Test a request waiting on something else between queries does not keep others from the database."""
+    pool = DBThreadPool(1)
+    between_queries = asyncio.Event()
+    thread_names = []
+
+    async def slow_request():
+        thread_names.append(await sync_to_async(lambda: threading.current_thread().name)())
+        await between_queries.wait()  # A password hash, a slow client...
+        return await sync_to_async(lambda: 'slow')()
+
+    async def fast_request():
+        result = await sync_to_async(lambda: 'fast')()
+        between_queries.set()
+        return result
+
+    async def main():
+        return await asyncio.gather(in_request(pool, slow_request), in_request(pool, fast_request))
+
+    assert asyncio.run(main()) == ['slow', 'fast']
+    assert thread_names[0].startswith('django-db')
+    assert pool.started == 1
+    assert pool.busy == 0
+
+
+def test_requests_over_the_limit_queue_for_a_thread():
+    """Test a call finding every DB thread busy waits for one without blocking the event loop."""
+    pool = DBThreadPool(1)
+    query_running = threading.Event()
+    waiting = []
+
+    async def busy_request():
+        return await sync_to_async(lambda: query_running.wait(5))()
+
+    async def queued_request():
+        await asyncio.sleep(0.01)
+        call = asyncio.ensure_future(sync_to_async(lambda: 'done')())
+        await asyncio.sleep(0.01)  # The loop keeps running while the call waits
+        waiting.append(len(pool.waiting))
+        query_running.set()
+        return await call
+
+    async def main():
+        return await asyncio.gather(in_request(pool, busy_request), in_request(pool, queued_request))
+
+    assert asyncio.run(main()) == [True, 'done']
+    assert waiting == [1]
+    assert pool.started == 1
+    assert pool.busy == 0
@@ -0,0 +1,24 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lazy_routers import LazyRouter
+
+
+def test_lazy_router_is_replaced_by_its_routes_on_first_request():
+    app = FastAPI()
+    app.router.routes.append(LazyRouter(app, '/metrics', 'routers.metrics'))
+
+    with TestClient(app) as client:
+        assert client.get('/metrics').status_code == 200
+        assert client.get('/metrics').status_code == 200
+
+    assert not any(isinstance(route, LazyRouter) for route in app.router.routes)
+    assert [route.path for route in app.router.routes if route.path == '/metrics'] == ['/metrics']
+
+
+def test_openapi_schema_lists_routers_not_loaded_yet(client):
+    schema = client.get('/openapi.json').json()
+
+    assert '/accounts/{account_id}' in schema['paths']
+    assert '/budgets/' in schema['paths']
+    assert '/metrics' not in schema['paths']
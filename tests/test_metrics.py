@@ -0,0 +1,32 @@
+import pytest
+
+from metrics import Histogram
+
+
+@pytest.mark.django_db(transaction=True)
+def test_metrics_are_labelled_with_the_route_template(client, test_account):
+    client.get(f'/accounts/{test_account.id}', params={'user_id': test_account.user_id})
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/accounts/{account_id}"}' in body
+    assert 'http_request_db_seconds_count{method="GET",route="/accounts/{account_id}"}' in body
+    assert f'route="/accounts/{test_account.id}"' not in body
+    assert 'db_threads_waiting 0' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.001, 0.01))
+    for nanoseconds in (500_000, 1_000_000, 5_000_000, 50_000_000):
+        histogram.observe(nanoseconds)
+
+    assert list(histogram.samples('latency')) == [
+        'latency_bucket{le="0.001"} 2',
+        'latency_bucket{le="0.01"} 3',
+        'latency_bucket{le="+Inf"} 4',
+        'latency_sum 0.0565',
+        'latency_count 4',
+    ]
@@ -0,0 +1,27 @@
+# tests/test_query_plans.py
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from db_app.management.commands.check_query_plans import find_sequential_scans
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='Small datasets may legitimately seq scan')
+
+
+@pytest.mark.django_db
+def test_router_queries_use_indexes():
+    """Test every main router query is answered through an index."""
+    call_command('seed_data', users=3, transactions=500, stdout=StringIO())
+
+    out = StringIO()
+    call_command('check_query_plans', stdout=out)
+    assert 'sequential scan' not in out.getvalue()
+
+
+def test_find_sequential_scans():
+    """Test full table scans are told apart from index searches."""
+    assert find_sequential_scans('3 0 0 SCAN db_app_transaction', 'sqlite') == ['db_app_transaction']
+    assert find_sequential_scans('3 0 0 SEARCH db_app_transaction USING INDEX idx (user_id=?)', 'sqlite') == []
+    assert find_sequential_scans('Seq Scan on db_app_account  (cost=0.00..1.01)', 'postgresql') == ['db_app_account']
@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+
+import middleware
+
+
+@pytest.mark.django_db(transaction=True)
+def test_server_timing_reports_request_queries(client, test_account):
+    response = client.get(f'/accounts/{test_account.id}', params={'user_id': test_account.user_id})
+
+    assert response.status_code == 200
+    db_timing, slowest_timing = response.headers['server-timing'].split(', ')
+    assert db_timing.startswith('db;dur=')
+    assert db_timing.endswith('desc="1 queries"')
+    assert slowest_timing.startswith('db-slowest;dur=')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_server_timing_counts_queued_writes(client, settings, test_account):
+    settings.SQLITE_WRITE_QUEUE = True
+    response = client.put(
+        f'/accounts/{test_account.id}', params={'user_id': test_account.user_id}, json={'name': 'Renamed'}
+    )
+
+    assert response.status_code == 200
+    assert response.headers['server-timing'].split(', ')[0].endswith('desc="1 queries"')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_request_over_query_budget_is_logged(client, test_account, monkeypatch, caplog):
+    monkeypatch.setattr(middleware, 'QUERY_BUDGET', 0)
+
+    with caplog.at_level(logging.INFO, logger='queries'):
+        client.get('/accounts/', params={'user_id': test_account.user_id})
+
+    (record,) = [record for record in caplog.records if record.name == 'queries']
+    assert record.levelno == logging.WARNING
+    assert record.path == '/accounts/'
+    assert record.queries == 1
+    assert 'Over query budget' in record.getMessage()
+
+
+def test_duplicate_statements_are_counted():
+    stats = middleware.QueryStats()
+    token = middleware.current_query_stats.set(stats)
+    try:
+        for account_id in (1, 2, 3):
+            middleware.record_query(
+                lambda *_args: None, 'SELECT * FROM account WHERE id = %s', (account_id,), False, {}
+            )
+    finally:
+        middleware.current_query_stats.reset(token)
+
+    assert stats.count == 3
+    assert stats.duplicates == 2
@@ -0,0 +1,32 @@
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_supervisor_serves_from_workers_and_stops_gracefully():
+    port = free_port()
+    supervisor = subprocess.Popen([sys.executable, 'serve.py', '--workers', '2', '--port', str(port)])
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                response = httpx.get(f'http://127.0.0.1:{port}/openapi.json')
+                break
+            except httpx.ConnectError:
+                assert time.monotonic() < deadline, 'The workers never started accepting'
+                time.sleep(0.2)
+        assert response.status_code == 200
+        assert '/accounts/' in response.json()['paths']
+    finally:
+        supervisor.send_signal(signal.SIGTERM)
+        assert supervisor.wait(timeout=30) == 0
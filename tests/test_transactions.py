@@ -1,9 +1,26 @@
-from datetime import datetime
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Q
 
-from db_app.models import Transaction
+import middleware
+import routers.transactions
+from db_app.ledger import transaction_balance_deltas
+from db_app.models import Account, Transaction, User
+from db_app.queries import supports_update_returning
+from db_app.write_queue import run_write
 from enums import TransactionTypeEnum
+from main import app
+from middleware import DBThreadPool
+from routers.transactions import TransactionUpdate, _create_transaction, get_transaction_db, update_transaction_db
 
 
 @pytest.mark.django_db(transaction=True)
@@ -12,8 +29,241 @@ def test_read_transactions(client, test_transaction, test_user):
     assert response.status_code == 200
 
     data = response.json()
-    assert isinstance(data, list)
-    assert any(tx['id'] == test_transaction.id for tx in data)
+    assert isinstance(data['items'], list)
+    assert any(tx['id'] == test_transaction.id for tx in data['items'])
+    assert data['next_cursor'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_transactions_paginated(client, test_user, test_account):
+    today = datetime.now().date()
+    created = [
+        Transaction.objects.create(
+            user=test_user,
+            account=test_account,
+            date=today - timedelta(days=offset % 2),  # Duplicate dates exercise the id tie-breaker
+            amount=Decimal('10.00'),
+            description=f'Tx {offset}',
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+        for offset in range(5)
+    ]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {'user_id': test_user.id, 'limit': 2}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get('/transactions/', params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data['items']) <= 2
+        seen.extend(tx['id'] for tx in data['items'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    expected = sorted(created, key=lambda tx: (tx.date, tx.id), reverse=True)
+    assert seen == [tx.id for tx in expected]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_transactions_invalid_cursor(client, test_user):
+    response = client.get('/transactions/', params={'user_id': test_user.id, 'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Invalid cursor.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_transactions_matches_detail_format(client, test_transaction, test_user):
+    # The page is serialized from `.values()` rows; it must look exactly like the response model
+    page = client.get('/transactions/', params={'user_id': test_user.id}).json()
+    detail = client.get(f'/transactions/{test_transaction.id}', params={'user_id': test_user.id}).json()
+    assert page['items'] == [detail]
+    assert detail['date'].endswith('T00:00:00')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_transactions_fields(client, test_user, test_account):
+    for offset in range(3):
+        Transaction.objects.create(
+            user=test_user,
+            account=test_account,
+            date=date(2025, 1, 1) + timedelta(days=offset),
+            amount=Decimal('10.00'),
+            description=f'Tx {offset}',
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+
+    params = {'user_id': test_user.id, 'limit': 2, 'fields': 'amount, id'}
+    data = client.get('/transactions/', params=params).json()
+    assert [set(tx) for tx in data['items']] == [{'id', 'amount'}] * 2
+    # The cursor still works although `date` was not selected
+    data = client.get('/transactions/', params={**params, 'cursor': data['next_cursor']}).json()
+    assert [tx['amount'] for tx in data['items']] == ['10.00']
+    assert data['next_cursor'] is None
+
+    response = client.get('/transactions/', params={'user_id': test_user.id, 'fields': 'amount,user_id'})
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Unknown fields: user_id.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_transactions_filtered(client, test_user, test_account):
+    other_account = Account.objects.create(user=test_user, name='Savings', account_type='Savings', balance=0)
+    created = [
+        Transaction.objects.create(
+            user=test_user,
+            account=test_account if offset % 2 else other_account,
+            date=date(2025, 1, 1) + timedelta(days=offset),
+            amount=Decimal(10 * offset),
+            description=f'Coffee {offset}' if offset < 6 else f'Rent {offset}',
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+        for offset in range(8)
+    ]
+    # Only days 3 and 5 are on the account, in the date and amount ranges and have the prefix
+    expected = [created[5].id, created[3].id]
+
+    params = {
+        'user_id': test_user.id,
+        'account_id': test_account.id,
+        'date_from': '2025-01-03',
+        'date_to': '2025-01-07',
+        'amount_min': '30',
+        'amount_max': '70',
+        'transaction_type': TransactionTypeEnum.EXPENSE.value,
+        'description_prefix': 'Coffee',
+        'limit': 1,
+    }
+    seen = []
+    cursor = None
+    while True:
+        data = client.get('/transactions/', params={**params, 'cursor': cursor} if cursor else params).json()
+        seen.extend(tx['id'] for tx in data['items'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+    assert seen == expected
+
+    response = client.get('/transactions/', params={'user_id': test_user.id, 'transaction_type': 'Refund'})
+    assert response.status_code == 422
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_transactions_ndjson(client, test_transaction, test_user):
+    response = client.get('/transactions/export', params={'user_id': test_user.id})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1
+    assert rows[0]['id'] == test_transaction.id
+    assert rows[0]['amount'] == '50.00'
+    assert rows[0]['description'] == 'Test Transaction'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_transactions_csv(client, test_transaction, test_user):
+    response = client.get('/transactions/export', params={'user_id': test_user.id, 'format': 'csv'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert int(rows[0]['id']) == test_transaction.id
+    assert rows[0]['transaction_type'] == TransactionTypeEnum.EXPENSE.value
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_transactions_in_chunks(client, test_user, test_account, monkeypatch):
+    monkeypatch.setattr(routers.transactions, 'EXPORT_CHUNK_SIZE', 2)
+    Transaction.objects.bulk_create(
+        Transaction(
+            user=test_user,
+            account=test_account,
+            date=date(2025, 1, day),
+            amount='1.00',
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+        for day in range(1, 6)
+    )
+
+    response = client.get('/transactions/export', params={'user_id': test_user.id})
+    assert response.status_code == 200
+    assert [json.loads(line)['date'] for line in response.text.splitlines()] == [
+        f'2025-01-0{day}' for day in range(1, 6)
+    ]
+
+
+async def asgi_get(app, path: str, query: str, send) -> None:
+    """One GET through the ASGI app, without a test client buffering the response; the client never disconnects."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [],
+        'client': ('testclient', 50000),
+        'server': ('testserver', 80),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Event().wait()
+
+    await app(scope, receive, send)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_partly_read_export_leaves_db_thread_free(test_user, test_account, monkeypatch):
+    """Test another request still gets the only DB thread while an export waits on a slow client."""
+    monkeypatch.setattr(middleware, 'db_thread_pool', DBThreadPool(1))
+    monkeypatch.setattr(routers.transactions, 'EXPORT_CHUNK_SIZE', 2)
+    Transaction.objects.bulk_create(
+        Transaction(
+            user=test_user,
+            account=test_account,
+            date=date(2025, 1, day),
+            amount='1.00',
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+        for day in range(1, 6)
+    )
+
+    async def main():
+        first_chunk_sent, client_reads = asyncio.Event(), asyncio.Event()
+        statuses = []
+
+        async def slow_client(message):
+            if message['type'] == 'http.response.body' and message.get('body'):
+                first_chunk_sent.set()
+                await client_reads.wait()
+
+        async def other_client(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        export = asyncio.create_task(asgi_get(app, '/transactions/export', f'user_id={test_user.id}', slow_client))
+        await asyncio.wait_for(first_chunk_sent.wait(), timeout=5)
+        await asyncio.wait_for(
+            asgi_get(app, f'/accounts/{test_account.id}', f'user_id={test_user.id}', other_client), timeout=5
+        )
+        client_reads.set()
+        await asyncio.wait_for(export, timeout=5)
+        return statuses
+
+    assert asyncio.run(main()) == [200]
 
 
 @pytest.mark.django_db(transaction=True)
@@ -99,3 +349,318 @@ def test_update_nonexistent_transaction(client, test_user, test_account):
 def test_delete_nonexistent_transaction(client, test_user):
     response = client.delete(f'/transactions/99999?user_id={test_user.id}')
     assert response.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_helpers_query_counts(test_transaction, test_user, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        transaction = async_to_sync(get_transaction_db)(test_transaction.id, test_user.id)
+    assert transaction.id == test_transaction.id
+
+    # Fields that do not move balances are updated in one statement
+    update_data = TransactionUpdate(description='Single Round Trip')
+    with django_assert_num_queries(1 if supports_update_returning(DEFAULT_DB_ALIAS) else 2):
+        transaction = async_to_sync(update_transaction_db)(test_transaction.id, test_user.id, update_data)
+    assert transaction.description == 'Single Round Trip'
+    assert transaction.amount == Decimal('50.00')
+
+
+def create_via_api(client, user, account, transaction_type, amount, from_account=None):
+    data = {
+        'amount': amount,
+        'description': transaction_type,
+        'date': datetime.now().isoformat(),
+        'account_id': account.id,
+        'from_account': from_account.id if from_account else None,
+        'transaction_type': transaction_type,
+    }
+    response = client.post(f'/transactions/?user_id={user.id}', json=data)
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_maintain_account_balances(client, test_user, test_account):
+    savings = Account.objects.create(user=test_user, name='Savings', balance='0.00', opening_balance='0.00')
+    test_account.opening_balance = test_account.balance  # Fixture accounts start out with their balance
+    test_account.save()
+
+    income = create_via_api(client, test_user, test_account, TransactionTypeEnum.INCOME.value, '20.00')
+    expense = create_via_api(client, test_user, test_account, TransactionTypeEnum.EXPENSE.value, '5.50')
+    create_via_api(client, test_user, savings, TransactionTypeEnum.TRANSFER.value, '10.00', from_account=test_account)
+
+    test_account.refresh_from_db()
+    savings.refresh_from_db()
+    assert test_account.balance == Decimal('105.00')  # 100.50 + 20.00 - 5.50 - 10.00
+    assert savings.balance == Decimal('10.00')
+
+    # Turning the income into a bigger expense reverses the old effect and applies the new one
+    response = client.put(
+        f'/transactions/{income["id"]}?user_id={test_user.id}',
+        json={'transaction_type': TransactionTypeEnum.EXPENSE.value, 'amount': '30.00'},
+    )
+    assert response.status_code == 200
+    test_account.refresh_from_db()
+    assert test_account.balance == Decimal('55.00')
+
+    assert client.delete(f'/transactions/{expense["id"]}?user_id={test_user.id}').status_code == 204
+    test_account.refresh_from_db()
+    assert test_account.balance == Decimal('60.50')
+
+    # A full rebuild from the opening balances agrees with the incrementally maintained ones
+    Account.objects.update(balance=0)
+    call_command('recompute_balances', stdout=io.StringIO())
+    test_account.refresh_from_db()
+    savings.refresh_from_db()
+    assert test_account.balance == Decimal('60.50')
+    assert savings.balance == Decimal('10.00')
+
+
+@pytest.mark.django_db
+def test_seed_data_balances_follow_the_ledger():
+    call_command('seed_data', users=2, accounts_per_user=2, transactions=200, stdout=io.StringIO())
+
+    transfers = Transaction.objects.filter(transaction_type=TransactionTypeEnum.TRANSFER.value)
+    assert not transfers.filter(transfer_account_id=F('account_id')).exists()
+    for account in Account.objects.all():
+        expected = account.opening_balance
+        for transaction in Transaction.objects.filter(Q(account=account) | Q(transfer_account=account)):
+            expected += transaction_balance_deltas(transaction).get(account.id, 0)
+        assert account.balance == expected
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_on_foreign_account_is_rejected(client, test_user, test_account):
+    other_user = test_user.__class__.objects.create(name='Other', email='other@example.com', password=b'x')
+    data = {
+        'amount': '10.00',
+        'date': datetime.now().isoformat(),
+        'account_id': test_account.id,
+        'transaction_type': TransactionTypeEnum.INCOME.value,
+    }
+    response = client.post(f'/transactions/?user_id={other_user.id}', json=data)
+    assert response.status_code == 404
+    assert not Transaction.objects.filter(user=other_user).exists()
+    test_account.refresh_from_db()
+    assert test_account.balance == Decimal('100.50')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_foreign_source_account_is_rejected_on_any_type(client, test_user, test_account, test_transaction):
+    other_user = test_user.__class__.objects.create(name='Other', email='other@example.com', password=b'x')
+    foreign = Account.objects.create(user=other_user, name='Not Mine', balance='0.00', opening_balance='0.00')
+    data = {
+        'amount': '10.00',
+        'date': datetime.now().isoformat(),
+        'account_id': test_account.id,
+        'from_account': foreign.id,
+        'transaction_type': TransactionTypeEnum.EXPENSE.value,
+    }
+    response = client.post(f'/transactions/?user_id={test_user.id}', json=data)
+    assert response.status_code == 404
+    response = client.post(f'/transactions/?user_id={test_user.id}', json={**data, 'from_account': foreign.id + 1})
+    assert response.status_code == 404
+    assert Transaction.objects.filter(user=test_user).count() == 1
+
+    response = client.put(
+        f'/transactions/{test_transaction.id}?user_id={test_user.id}', json={'from_account': foreign.id}
+    )
+    assert response.status_code == 404
+    test_transaction.refresh_from_db()
+    assert test_transaction.transfer_account_id is None
+
+    del data['date']
+    response = client.post(f'/transactions/bulk?user_id={test_user.id}', json=[data])
+    assert response.status_code == 201
+    assert response.json()['created'] == 0
+    test_account.refresh_from_db()
+    assert test_account.balance == Decimal('100.50')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_import_json(client, test_user, test_account):
+    other_user = test_user.__class__.objects.create(name='Other', email='other@example.com', password=b'x')
+    foreign = Account.objects.create(user=other_user, name='Not Mine', balance='0.00', opening_balance='0.00')
+    rows = [
+        {'amount': '20.00', 'account_id': test_account.id, 'transaction_type': TransactionTypeEnum.INCOME.value},
+        {'amount': '5.50', 'account_id': test_account.id, 'transaction_type': TransactionTypeEnum.EXPENSE.value},
+        {'amount': '1.00', 'account_id': test_account.id, 'transaction_type': 'Refund'},
+        {'amount': '1.00', 'account_id': foreign.id, 'transaction_type': TransactionTypeEnum.INCOME.value},
+    ]
+    response = client.post(f'/transactions/bulk?user_id={test_user.id}', json=rows)
+    assert response.status_code == 201
+
+    data = response.json()
+    assert data['created'] == 2
+    assert [error['index'] for error in data['errors']] == [2, 3]
+    assert Transaction.objects.filter(user=test_user).count() == 2
+    test_account.refresh_from_db()
+    foreign.refresh_from_db()
+    assert test_account.balance == Decimal('115.00')  # 100.50 + 20.00 - 5.50
+    assert foreign.balance == Decimal('0.00')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_import_ndjson(client, test_user, test_account):
+    row = {'amount': '1.25', 'account_id': test_account.id, 'transaction_type': TransactionTypeEnum.EXPENSE.value}
+    body = '\n'.join([json.dumps(row)] * 3 + ['{not json', ''])
+    response = client.post(
+        f'/transactions/bulk?user_id={test_user.id}',
+        content=body,
+        headers={'content-type': 'application/x-ndjson'},
+    )
+    assert response.status_code == 201
+    assert response.json()['created'] == 3
+    assert [error['index'] for error in response.json()['errors']] == [3]
+    test_account.refresh_from_db()
+    assert test_account.balance == Decimal('96.75')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_import_rejects_non_array(client, test_user):
+    response = client.post(f'/transactions/bulk?user_id={test_user.id}', json={'amount': '1.00'})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_import_rejects_oversized_body(client, test_user, test_account, monkeypatch):
+    monkeypatch.setattr(routers.transactions, 'MAX_BULK_BYTES', 64)
+    row = {'amount': '1.00', 'account_id': test_account.id, 'transaction_type': TransactionTypeEnum.INCOME.value}
+
+    response = client.post(f'/transactions/bulk?user_id={test_user.id}', json=[row] * 10)
+    assert response.status_code == 413
+
+    # Without a Content-Length the cap applies while the body is read
+    response = client.post(
+        f'/transactions/bulk?user_id={test_user.id}',
+        content=iter([json.dumps([row] * 5).encode()] * 2),
+        headers={'content-type': 'application/x-ndjson'},
+    )
+    assert response.status_code == 413
+    assert not Transaction.objects.filter(user=test_user).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_summaries(client, test_user, test_account):
+    savings = Account.objects.create(user=test_user, name='Savings', balance='0.00', opening_balance='0.00')
+    rows = [
+        (date(2025, 1, 6), test_account, TransactionTypeEnum.INCOME.value, '100.00'),
+        (date(2025, 1, 7), test_account, TransactionTypeEnum.EXPENSE.value, '20.00'),
+        (date(2025, 1, 20), savings, TransactionTypeEnum.EXPENSE.value, '5.00'),
+        (date(2025, 2, 1), savings, TransactionTypeEnum.TRANSFER.value, '30.00'),
+    ]
+    for day, account, transaction_type, amount in rows:
+        Transaction.objects.create(
+            user=test_user, account=account, date=day, amount=amount, description='', transaction_type=transaction_type
+        )
+    params = {'user_id': test_user.id}
+
+    response = client.get('/transactions/summary/by-type', params=params)
+    assert response.status_code == 200
+    by_type = {row['transaction_type']: row for row in response.json()}
+    assert Decimal(by_type['Expense']['total']) == Decimal('25.00')
+    assert by_type['Expense']['count'] == 2
+    # Money keeps its two decimal places whatever the database hands back for a sum
+    assert by_type['Expense']['total'] == '25.00'
+    assert by_type['Income']['total'] == '100.00'
+
+    response = client.get('/transactions/summary/by-account', params={**params, 'end_date': '2025-01-31'})
+    by_account = {row['account_id']: row for row in response.json()}
+    assert Decimal(by_account[test_account.id]['income']) == Decimal('100.00')
+    assert Decimal(by_account[test_account.id]['expense']) == Decimal('20.00')
+    assert by_account[savings.id]['expense'] == '5.00'
+    assert by_account[savings.id]['transfer'] == '0.00'  # The transfer is outside the range
+    assert by_account[savings.id]['count'] == 1
+
+    response = client.get('/transactions/summary/by-period', params={**params, 'interval': 'month'})
+    assert [row['period'] for row in response.json()] == ['2025-01-01', '2025-02-01']
+    assert Decimal(response.json()[0]['expense']) == Decimal('25.00')
+
+    response = client.get(
+        '/transactions/summary/by-period', params={**params, 'interval': 'week', 'start_date': '2025-01-07'}
+    )
+    assert [row['period'] for row in response.json()] == ['2025-01-06', '2025-01-20', '2025-01-27']
+    assert response.json()[0]['count'] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_queue_commits_concurrent_writes(settings, test_user, test_account):
+    settings.SQLITE_WRITE_QUEUE = True
+    values = {
+        'amount': Decimal('1.00'),
+        'description': 'Queued',
+        'date': datetime.now(),
+        'account_id': test_account.id,
+        'transaction_type': TransactionTypeEnum.EXPENSE.value,
+    }
+
+    async def write_concurrently():
+        jobs = [run_write(_create_transaction, test_user.id, values) for _ in range(20)]
+        # A failing job rolls back its own savepoint only, not the rest of its batch
+        jobs.append(run_write(_create_transaction, test_user.id, {**values, 'account_id': 0}))
+        return await asyncio.gather(*jobs, return_exceptions=True)
+
+    results = async_to_sync(write_concurrently)()
+    assert all(isinstance(result, Transaction) for result in results[:-1])
+    assert isinstance(results[-1], Account.DoesNotExist)
+    assert Transaction.objects.filter(description='Queued').count() == 20
+    test_account.refresh_from_db()
+    assert test_account.balance == Decimal('80.50')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_transaction_conditional(client, test_transaction, test_user):
+    url = f'/transactions/{test_transaction.id}'
+    etag = client.get(url, params={'user_id': test_user.id}).headers['etag']
+    assert client.get(url, params={'user_id': test_user.id}, headers={'If-None-Match': etag}).status_code == 304
+
+    client.put(url, params={'user_id': test_user.id}, json={'description': 'Changed'})
+    response = client.get(url, params={'user_id': test_user.id}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json()['description'] == 'Changed'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_transactions(client, test_user, test_account):
+    def create(description: str, user: User = test_user, account: Account = test_account) -> Transaction:
+        return Transaction.objects.create(
+            user=user,
+            account=account,
+            date=date(2025, 1, 1),
+            amount=Decimal('10.00'),
+            description=description,
+            transaction_type=TransactionTypeEnum.EXPENSE.value,
+        )
+
+    rent = create('Monthly rent payment')
+    rent_deposit = create('Rental deposit, rent for March')
+    create('Coffee')
+    other_user = User.objects.create(name='Other', email='other@example.com', password=b'x')
+    other_account = Account.objects.create(user=other_user, name='Main', account_type='Checking Account', balance=0)
+    create('Rent', user=other_user, account=other_account)
+
+    def search(q: str, **params) -> dict:
+        response = client.get('/transactions/search', params={'user_id': test_user.id, 'q': q, **params})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    data = search('RENT')
+    # Prefix matches, best match (two occurrences) first, other users' rows never show up
+    assert [hit['id'] for hit in data['items']] == [rent_deposit.id, rent.id]
+    assert data['items'][0]['rank'] >= data['items'][1]['rank']
+    assert data['items'][1]['description'] == 'Monthly rent payment'
+    assert data['next_offset'] is None
+    assert [hit['id'] for hit in search('rent "march')['items']] == [rent_deposit.id]
+
+    first = search('rent', limit=1)
+    assert first['next_offset'] == 1
+    assert [hit['id'] for hit in search('rent', limit=1, offset=1)['items']] == [rent.id]
+
+    # The index follows writes
+    client.put(f'/transactions/{rent.id}', params={'user_id': test_user.id}, json={'description': 'Groceries'})
+    Transaction.objects.filter(id=rent_deposit.id).delete()
+    assert search('rent')['items'] == []
+    assert [hit['id'] for hit in search('groc')['items']] == [rent.id]
+
+    response = client.get('/transactions/search', params={'user_id': test_user.id, 'q': '"*"'})
+    assert response.status_code == 400
@@ -1,9 +1,17 @@
 # tests/test_users.py
 import pytest
+from asgiref.sync import async_to_sync
 from fastapi.testclient import TestClient  # Use sync client here too
 
 from db_app.models import User  #
-from utils import is_correct_password
+from routers.users import UserUpdate, update_user_db
+from utils import (
+    create_access_token,
+    current_users,
+    get_hashed_password,
+    is_correct_password,
+    token_versions,
+)
 
 
 @pytest.mark.django_db(transaction=True)
@@ -190,3 +198,92 @@ def test_delete_user_not_found(client: TestClient):
     non_existent_user_id = 99999
     response = client.delete(f'/users/{non_existent_user_id}')
     assert response.status_code == 404  # Expecting Not Found from get_user_db
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_me_sees_changes_made_by_other_workers(client: TestClient, test_user: User, auth_headers):
+    """Test /users/me reflects a profile change this process never saw once its cached user expires."""
+    assert client.get('/users/me', headers=auth_headers).json()['name'] == test_user.name
+
+    # As if another worker process had handled the update: nothing in this process was invalidated
+    User.objects.filter(id=test_user.id).update(name='Renamed Elsewhere', email='moved@example.com')
+    assert client.get('/users/me', headers=auth_headers).json()['name'] == test_user.name
+
+    current_users.delete((test_user.id, test_user.token_version))  # Expired
+    response = client.get('/users/me', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Renamed Elsewhere'
+    # The token still carries the old email claim; the user is found by id
+    assert response.json()['email'] == 'moved@example.com'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_me_is_reloaded_for_a_new_token_version(client: TestClient, test_user: User, auth_headers):
+    """Test the cached user of a token version is not served to tokens issued after a revocation."""
+    assert client.get('/users/me', headers=auth_headers).json()['name'] == test_user.name
+
+    # Renamed and revoked by another worker process, then logged in again
+    User.objects.filter(id=test_user.id).update(name='Renamed Elsewhere', token_version=1)
+    token = create_access_token({'email': test_user.email, 'id': test_user.id, 'ver': 1})
+    token_versions.delete(test_user.id)  # This process's copy of the version expired
+
+    response = client.get('/users/me', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Renamed Elsewhere'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_update_me_invalidates_token_cache(client: TestClient, test_user: User, auth_headers):
+    """Test a cached user snapshot is dropped once the user is updated."""
+    assert client.get('/users/me', headers=auth_headers).json()['name'] == test_user.name
+
+    response = client.patch('/users/', headers=auth_headers, json={'name': 'Renamed User'})
+    assert response.status_code == 200
+
+    response = client.get('/users/me', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Renamed User'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_update_without_new_password_leaves_password_alone(test_user: User):
+    """Test a profile-only update does not write back the password of the copy it was given."""
+    stale_user = User.objects.get(id=test_user.id)
+    # Changed by another request after this one loaded the user
+    User.objects.filter(id=test_user.id).update(password=get_hashed_password('changedElsewhere1'))
+
+    updated_user = async_to_sync(update_user_db)(stale_user, UserUpdate(name='Renamed User'))
+    assert updated_user.name == 'Renamed User'
+
+    test_user.refresh_from_db()
+    assert test_user.name == 'Renamed User'
+    assert is_correct_password('changedElsewhere1', test_user.password)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_change_password_through_me(client: TestClient, test_user: User, auth_headers):
+    """Test changing the password with PATCH /users/ after the user was cached."""
+    assert client.get('/users/me', headers=auth_headers).status_code == 200
+
+    response = client.patch(
+        '/users/', headers=auth_headers, json={'password': 'testpassword', 'new_password': 'freshPassword1'}
+    )
+    assert response.status_code == 200
+
+    test_user.refresh_from_db()
+    assert is_correct_password('freshPassword1', test_user.password)
+    # Tokens issued before the change no longer work
+    assert client.get('/users/me', headers=auth_headers).status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_me_invalidates_token_cache(client: TestClient, test_user: User, auth_headers):
+    """Test a deleted user can no longer be resolved from a cached token."""
+    assert client.get('/users/me', headers=auth_headers).status_code == 200
+
+    assert client.delete('/users/', headers=auth_headers).status_code == 204
+    assert not User.objects.filter(id=test_user.id).exists()
+
+    # Deleting the user revoked its tokens
+    response = client.get('/users/me', headers=auth_headers)
+    assert response.status_code == 401
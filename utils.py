@@ -1,8 +1,15 @@
+import asyncio
+import base64
+import binascii
+import multiprocessing
 import os
-from datetime import UTC, datetime, timedelta
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
 from typing import Annotated
 
-import bcrypt
 import jwt
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
@@ -10,24 +17,101 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import BaseModel
 
+from cache import TTLCache
+from metrics import metrics
+
 load_dotenv('.env')
 
 SECRET_KEY = os.environ.get('SECRET_KEY')
 ALGORITHM = os.environ.get('ALGORITHM')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES'))
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '4096'))
+TOKEN_CACHE_TTL_SECONDS = int(os.environ.get('TOKEN_CACHE_TTL_SECONDS', '300'))
+# How long a process trusts its copy of a user's token version; a revocation made elsewhere takes this long to apply
+TOKEN_VERSION_TTL_SECONDS = int(os.environ.get('TOKEN_VERSION_TTL_SECONDS', '30'))
+
+# bcrypt cost factor for new hashes; stored hashes with another cost are upgraded on login
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+# Dedicated processes for bcrypt work, and how many jobs may be queued or running before we shed load
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', str(PASSWORD_HASH_WORKERS * 8)))
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/login')
 
 
-def get_hashed_password(password: str) -> bytes:
-    salt = bcrypt.gensalt()
+def get_hashed_password(password: str, rounds: int = BCRYPT_ROUNDS) -> bytes:
+    # bcrypt is imported where it runs, mostly in the password pool's processes, to keep it out of server startup
+    import bcrypt
+
+    salt = bcrypt.gensalt(rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed
 
 
 def is_correct_password(plain_password: str, hashed_password: bytes) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password)
+    import bcrypt
+
+    # BinaryField values come back as memoryview on some backends
+    return bcrypt.checkpw(plain_password.encode('utf-8'), bytes(hashed_password))
+
+
+def password_needs_rehash(hashed_password: bytes) -> bool:
+    # bcrypt hashes look like b'$2b$12$<salt><hash>', the cost sits between the 2nd and 3rd '$'
+    return int(bytes(hashed_password).split(b'$')[2]) != BCRYPT_ROUNDS
+
+
+_password_executor: ProcessPoolExecutor | None = None
+_password_executor_lock = threading.Lock()
+_pending_password_jobs = 0
+_pending_password_jobs_lock = threading.Lock()
+
+
+def _get_password_executor() -> ProcessPoolExecutor:
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            # Created lazily so every server worker process gets its own pool.
+            # 'spawn' keeps the children clear of the parent's threads and open DB connections.
+            _password_executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _password_executor
+
+
+async def _run_password_job(func, *args):
+    """
+    Run bcrypt work in the password pool without blocking the event loop or the threadpool.
+    Fails fast with 503 once PASSWORD_HASH_MAX_PENDING jobs are already waiting.
+    """
+    global _pending_password_jobs
+    with _pending_password_jobs_lock:
+        if _pending_password_jobs >= PASSWORD_HASH_MAX_PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail='Too many concurrent password operations, retry shortly.',
+                headers={'Retry-After': '1'},
+            )
+        _pending_password_jobs += 1
+    started = time.perf_counter_ns()
+    try:
+        return await asyncio.wrap_future(_get_password_executor().submit(func, *args))
+    finally:
+        metrics.password_hash.observe(time.perf_counter_ns() - started)
+        with _pending_password_jobs_lock:
+            _pending_password_jobs -= 1
+
+
+def pending_password_jobs() -> int:
+    return _pending_password_jobs
+
+
+async def hash_password_async(password: str) -> bytes:
+    return await _run_password_job(get_hashed_password, password, BCRYPT_ROUNDS)
+
+
+async def check_password_async(plain_password: str, hashed_password: bytes) -> bool:
+    return await _run_password_job(is_correct_password, plain_password, bytes(hashed_password))
 
 
 def create_access_token(data: dict[str, str | int], expires_delta: timedelta | None = None):
@@ -40,20 +124,87 @@ def create_access_token(data: dict[str, str | int], expires_delta: timedelta | N
 class Payload(BaseModel):
     id: int
     email: str
+    ver: int = 0  # User.token_version when the token was issued; tokens from before versioning count as 0
     exp: datetime | None = None
 
 
-def decode_access_token(token: Annotated[str, Depends(oauth2_scheme)]) -> Payload:
+@dataclass(slots=True)
+class CachedToken:
+    # Only the verified identity: profile data changes in other worker processes, so it is read fresh
+    payload: Payload
+
+
+# Verified tokens, keyed by the raw token string. Entries never outlive the token's `exp`.
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+# Current User.token_version by user id, so checking a token against revocation usually needs no query
+token_versions = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_VERSION_TTL_SECONDS)
+
+# User rows by (id, token_version), for routers.users.get_current_user. A profile change made in another worker
+# process shows here once the entry expires, like a revocation does; a password change moves the version on
+current_users = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_VERSION_TTL_SECONDS)
+
+
+def forget_user_tokens(user_id: int) -> None:
+    """Drop the cached tokens of a user after it changed or was deleted."""
+    token_cache.discard_if(lambda entry: entry.payload.id == user_id)
+    token_versions.delete(user_id)
+    current_users.discard_if(lambda user: user.id == user_id)
+
+
+async def decode_access_token(token: Annotated[str, Depends(oauth2_scheme)]) -> Payload:
+    # Async so the (cheap) HMAC check runs on the event loop instead of taking a threadpool slot
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.payload
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
+    started = time.perf_counter_ns()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get('email')
         if email is None:
             raise credentials_exception
-        return Payload(**payload)
+        payload = Payload(**payload)
     except InvalidTokenError:
         raise credentials_exception
+    finally:
+        metrics.token_verify.observe(time.perf_counter_ns() - started)
+
+    ttl = payload.exp.timestamp() - time.time() if payload.exp else None
+    if ttl is None or ttl > 0:
+        token_cache.set(token, CachedToken(payload=payload), ttl=ttl)
+    return payload
+
+
+def encode_cursor(last_date: date, last_id: int) -> str:
+    """Build an opaque keyset cursor pointing just past the given (date, id) row."""
+    raw = f'{last_date.isoformat()}|{last_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    invalid_cursor_exception = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor.')
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        last_date, last_id = raw.split('|')
+        return date.fromisoformat(last_date), int(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise invalid_cursor_exception
+
+
+def parse_fields(fields: str | None, allowed: tuple[str, ...]) -> tuple[str, ...]:
+    """Columns asked for with `fields=id,amount`, in response order; every one of `allowed` when not given."""
+    requested = {field.strip() for field in (fields or '').split(',') if field.strip()}
+    if not requested:
+        return allowed
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f'Unknown fields: {", ".join(sorted(unknown))}.'
+        )
+    return tuple(field for field in allowed if field in requested)